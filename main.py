@@ -5,22 +5,43 @@
 """
 
 import argparse
+import asyncio
+import glob
+import hashlib
 import json
 import logging
 import os
 import shutil
 import signal
 import sys
-import time
+import threading
 import traceback
+import types
 import urllib.parse
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple, TypedDict, Union
-
-import requests
-from tabulate import tabulate
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, TypedDict, Union
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:
+    # Без orjson работаем через stdlib json с тем же интерфейсом (bytes на выходе)
+    orjson = types.SimpleNamespace(
+        OPT_INDENT_2=1,
+        JSONDecodeError=json.JSONDecodeError,
+        loads=json.loads,
+        dumps=lambda obj, option=0: json.dumps(
+            obj, ensure_ascii=False, indent=2 if option else None,
+            separators=None if option else (",", ":")).encode("utf-8"),
+    )
+
+try:
+    import zstandard
+except ImportError:
+    # Без zstandard архивы журнала остаются несжатыми
+    zstandard = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,17 +51,35 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 API_URL = "http://157.230.95.209:30003/get_ppg_data"
+API_BULK_URL = "http://157.230.95.209:30003/get_ppg_data_bulk"
 MY_TZ = timezone(timedelta(hours=3))
+TS_FMT = "%Y-%m-%d-%H-%M-%S"  # Формат времени в параметрах API и в FIXED_START
 TIME_FETCH_SEC = 60         # Длительность окна для выборки данных с сервера
 FETCH_INTERVAL_SEC = 4      # Интервал между запросами
+REQUEST_TIMEOUT_SEC = 10    # Таймаут одного HTTP-запроса
+KEEPALIVE_TIMEOUT_SEC = 90  # Время жизни простаивающего соединения
+MAX_CONNECTIONS = 32        # Предел одновременных соединений по умолчанию
+FETCH_RETRIES = 2           # Повторы запроса при сетевой ошибке
+FETCH_RETRY_BACKOFF_SEC = 0.2  # Базовая задержка между повторами
+HTTP_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",  # Сжатые ответы распаковываются aiohttp
+    "Connection": "keep-alive",
+    "User-Agent": "swaid-poller/1.0",
+}
 
 USE_FIXED_START = False
 FIXED_START = "2025-05-15-16-23-00"
 
 BRACELETS_FILE = "bracelets.json"
-MEASUREMENTS_FILE = "measurements.json"
+MEASUREMENTS_FILE = "measurements.jsonl"   # Журнал измерений, по записи на строку
+LEGACY_MEASUREMENTS_FILE = "measurements.json"  # Прежний формат: JSON-массив
 TD_DATA_FILE = "td_data.json"
 BACKUP_DIR = "backup"
+ROTATE_INTERVAL_SEC = 3600  # Журнал измерений переносится в BACKUP_DIR раз в час
+ROTATE_SIZE_MB = 50         # ...или раньше, если журнал превысил этот размер
+MAX_ROTATED_FILES = 48      # Сколько архивов журнала хранить в BACKUP_DIR
+ZSTD_LEVEL = 3              # Уровень сжатия архивов журнала
+IO_BUFFER_SIZE = 64 * 1024  # Буфер построчного чтения/записи журнала
 
 DEFAULT_BRACELETS = [
     {
@@ -52,6 +91,22 @@ DEFAULT_BRACELETS = [
 DEFAULT_MEASUREMENTS: List[Dict] = []
 DEFAULT_TD_DATA: Dict = {}
 
+# ANSI-цвета для кодов ответа HTTP: 200 — синий, 404 — желтый, прочие — сброс
+_STATUS_COLORS = {200: "\033[36m", 404: "\033[33m"}
+
+# Сбрасывается в False после первого ответа 404 от пакетного маршрута
+bulk_route_available = True
+# Хэш последнего записанного содержимого TD_DATA_FILE
+last_td_digest: Optional[bytes] = None
+# Размер журнала измерений, после которого он переносится в архив
+rotate_max_bytes = ROTATE_SIZE_MB * 1024 * 1024
+# Открытый на дозапись журнал измерений (открывается при первой записи)
+measurements_fp: Optional[BinaryIO] = None
+# Последняя разобранная строка FIXED_START и соответствующее ей время
+_fixed_start_cache: Optional[Tuple[str, datetime]] = None
+# Не даёт двум фоновым проходам обслуживания архивов работать одновременно
+_archive_lock = threading.Lock()
+
 
 class Measurement(TypedDict):
     """Тип для представления измерений одного браслета."""
@@ -66,20 +121,290 @@ class Measurement(TypedDict):
     si: Optional[float]
 
 
+class MeasurementBatch(TypedDict):
+    """Измерения одного браслета за запрос в колоночном виде.
+
+    Списки параметров берутся из ответа сервера как есть и имеют одинаковую
+    длину; построчные словари Measurement собираются только при записи.
+    Сервер отдаёт измерения упорядоченными по времени, и этот порядок
+    сохраняется.
+    """
+    session: Union[int, str]
+    device_mac: str
+    device_name: str
+    timestamp: List[str]
+    hr: List[Optional[int]]
+    lf_hf_ratio: List[Optional[float]]
+    rmssd: List[Optional[int]]
+    sdrr: List[Optional[int]]
+    si: List[Optional[float]]
+
+
+def batch_size(batch: MeasurementBatch) -> int:
+    """Возвращает число измерений в пакете."""
+    return len(batch["timestamp"])
+
+
+def iter_rows(batches: List[MeasurementBatch]) -> Iterator[Measurement]:
+    """Разворачивает пакеты измерений в построчные записи.
+
+    Args:
+        batches: Список пакетов измерений.
+
+    Yields:
+        Измерения в порядке пакетов и времени внутри пакета.
+    """
+    for batch in batches:
+        session_val = batch["session"]
+        device_mac = batch["device_mac"]
+        device_name = batch["device_name"]
+        for ts, hr, lf_hf, rmssd, sdrr, si in zip(
+            batch["timestamp"], batch["hr"], batch["lf_hf_ratio"],
+            batch["rmssd"], batch["sdrr"], batch["si"]
+        ):
+            yield {
+                "session": session_val,
+                "device_mac": device_mac,
+                "device_name": device_name,
+                "timestamp": ts,
+                "hr": hr,
+                "lf_hf_ratio": lf_hf,
+                "rmssd": rmssd,
+                "sdrr": sdrr,
+                "si": si,
+            }
+
+
+def _fmt_ts(dt: datetime) -> str:
+    """Форматирует время для параметров API (как strftime(TS_FMT))."""
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}-"
+            f"{dt.hour:02d}-{dt.minute:02d}-{dt.second:02d}")
+
+
+def _fmt_ts_ms(dt: datetime) -> str:
+    """Форматирует время с миллисекундами для вывода (как "%Y-%m-%d %H:%M:%S.%f"[:-3])."""
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+            f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}.{dt.microsecond // 1000:03d}")
+
+
 def ensure_file(filename: str, default_data: List | Dict) -> None:
     """Создаёт файл с данными по умолчанию, если он отсутствует.
 
+    Файлы с расширением .jsonl записываются построчно (одна запись на строку).
+
     Args:
         filename: Имя файла для проверки/создания.
         default_data: Данные для записи в файл в формате JSON.
     """
+    if os.path.exists(filename):
+        return
     os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
-    if not os.path.exists(filename):
-        with open(filename, "w", encoding="utf-8") as file:
-            json.dump(default_data, file, indent=2)
-        logger.info("Создан файл: %s", filename)
-    else:
-        logger.info("Файл %s существует", filename)
+    with open(filename, "wb") as file:
+        if filename.endswith(".jsonl"):
+            file.writelines(orjson.dumps(item) + b"\n" for item in default_data)
+        else:
+            file.write(orjson.dumps(default_data, option=orjson.OPT_INDENT_2))
+    logger.info("Создан файл: %s", filename)
+
+
+def iter_measurements(filename: str) -> Iterator[Measurement]:
+    """Построчно читает измерения из JSONL-файла.
+
+    Повреждённые строки (например, недописанная последняя строка после
+    аварийного завершения) пропускаются с предупреждением.
+
+    Args:
+        filename: Имя JSONL-файла.
+
+    Yields:
+        Измерения в порядке записи.
+    """
+    with open(filename, "rb", buffering=IO_BUFFER_SIZE) as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as error:
+                logger.warning("%s:%d пропущена строка: %s",
+                               filename, line_number, error)
+
+
+def migrate_measurements() -> None:
+    """Переносит историю из LEGACY_MEASUREMENTS_FILE в MEASUREMENTS_FILE.
+
+    Выполняется однократно: только если JSONL-файла ещё нет, а файл в
+    прежнем формате (JSON-массив) существует. Старый файл не удаляется.
+    """
+    if os.path.exists(MEASUREMENTS_FILE) or not os.path.exists(LEGACY_MEASUREMENTS_FILE):
+        return
+    try:
+        with open(LEGACY_MEASUREMENTS_FILE, "rb") as file:
+            history: List[Measurement] = orjson.loads(file.read())
+    except (orjson.JSONDecodeError, OSError) as error:
+        logger.error("Ошибка миграции %s: %s", LEGACY_MEASUREMENTS_FILE, error)
+        return
+    with open(MEASUREMENTS_FILE, "wb", buffering=IO_BUFFER_SIZE) as file:
+        file.writelines(orjson.dumps(m) + b"\n" for m in history)
+    logger.info("Миграция: %d измерений %s -> %s", len(history),
+                LEGACY_MEASUREMENTS_FILE, MEASUREMENTS_FILE)
+
+
+def compact_measurements(output_filename: str) -> int:
+    """Собирает журнал MEASUREMENTS_FILE в один JSON-массив.
+
+    Нужен для потребителей, ожидающих прежний формат measurements.json.
+
+    Args:
+        output_filename: Имя файла, в который записывается массив.
+
+    Returns:
+        Количество записанных измерений.
+    """
+    history = list(iter_measurements(MEASUREMENTS_FILE))
+    write_atomic(output_filename, orjson.dumps(history, option=orjson.OPT_INDENT_2))
+    logger.info("Сборка: %d измерений %s -> %s", len(history),
+                MEASUREMENTS_FILE, output_filename)
+    return len(history)
+
+
+def write_atomic(filename: str, payload: bytes) -> None:
+    """Атомарно заменяет содержимое файла.
+
+    Данные пишутся во временный файл в той же директории и затем
+    подменяют исходный через os.replace, поэтому читатель никогда не
+    увидит частично записанный файл.
+
+    Args:
+        filename: Имя целевого файла.
+        payload: Новое содержимое файла.
+    """
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as file:
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_filename, filename)
+
+
+def append_measurements(batches: List[MeasurementBatch]) -> None:
+    """Дописывает пакеты измерений в конец MEASUREMENTS_FILE.
+
+    Файл открывается один раз и остаётся открытым между циклами. Буфер
+    сбрасывается в конце каждой записи, поэтому читатели и бэкап видят
+    только целые строки.
+
+    Args:
+        batches: Пакеты измерений за цикл.
+    """
+    global measurements_fp
+    if measurements_fp is None:
+        measurements_fp = open(MEASUREMENTS_FILE, "ab", buffering=IO_BUFFER_SIZE)
+    measurements_fp.writelines(orjson.dumps(m) + b"\n" for m in iter_rows(batches))
+    measurements_fp.flush()
+
+
+def close_measurements() -> None:
+    """Закрывает журнал измерений; следующая запись откроет его заново."""
+    global measurements_fp
+    if measurements_fp is not None:
+        measurements_fp.close()
+        measurements_fp = None
+
+
+def rotate_measurements() -> None:
+    """Переносит журнал измерений в архив при смене часа или росте размера.
+
+    Если MEASUREMENTS_FILE последний раз изменялся в предыдущем интервале
+    ROTATE_INTERVAL_SEC или стал больше rotate_max_bytes, он перемещается
+    в BACKUP_DIR под именем measurements_YYYYMMDD_HH.jsonl (по времени
+    последней записи), и следующая запись начинает новый файл. Так размер
+    рабочего журнала остаётся ограниченным. Архив сжимается и старые
+    архивы удаляются в фоновом потоке (см. maintain_archives).
+    """
+    try:
+        stat = os.stat(MEASUREMENTS_FILE)
+    except FileNotFoundError:
+        # Файл удалён извне: следующая запись должна создать новый
+        close_measurements()
+        return
+    now = datetime.now(MY_TZ).timestamp()
+    same_interval = stat.st_mtime // ROTATE_INTERVAL_SEC == now // ROTATE_INTERVAL_SEC
+    if stat.st_size == 0 or (same_interval and stat.st_size <= rotate_max_bytes):
+        return
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    base_name, extension = os.path.splitext(MEASUREMENTS_FILE)
+    stamp = datetime.fromtimestamp(stat.st_mtime, MY_TZ).strftime("%Y%m%d_%H")
+    archive_path = os.path.join(BACKUP_DIR, f"{base_name}_{stamp}{extension}")
+    if os.path.exists(archive_path) or os.path.exists(archive_path + ".zst"):
+        stamp = datetime.fromtimestamp(now, MY_TZ).strftime("%Y%m%d_%H%M%S")
+        archive_path = os.path.join(BACKUP_DIR, f"{base_name}_{stamp}{extension}")
+    close_measurements()
+    try:
+        os.replace(MEASUREMENTS_FILE, archive_path)
+        logger.info("Ротация: %s -> %s", MEASUREMENTS_FILE, archive_path)
+    except OSError as error:
+        logger.error("Ошибка ротации %s: %s", MEASUREMENTS_FILE, error)
+        return
+    threading.Thread(target=maintain_archives, name="maintain-archives",
+                     daemon=True).start()
+
+
+def compress_archive(archive_path: str) -> None:
+    """Сжимает архив журнала в .zst.
+
+    Сжатый файл пишется во временный и переименовывается только после
+    успешной записи; исходный архив удаляется после этого. Если .zst уже
+    есть (прошлый запуск прервался между переименованием и удалением),
+    удаляется только исходный архив.
+
+    Args:
+        archive_path: Путь к несжатому архиву журнала в BACKUP_DIR.
+    """
+    compressed_path = archive_path + ".zst"
+    tmp_path = compressed_path + ".tmp"
+    try:
+        if not os.path.exists(compressed_path):
+            with open(archive_path, "rb") as src, open(tmp_path, "wb") as dst:
+                zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(src, dst)
+            os.replace(tmp_path, compressed_path)
+        os.remove(archive_path)
+        logger.info("Сжатие: %s -> %s", archive_path, compressed_path)
+    except OSError as error:
+        logger.error("Ошибка сжатия %s: %s", archive_path, error)
+
+
+def maintain_archives() -> None:
+    """Приводит архивы журнала в BACKUP_DIR в порядок.
+
+    Выполняется в фоновом потоке при запуске и после каждой ротации, чтобы
+    цикл опроса не ждал сжатия. Удаляет недописанные *.zst.tmp, оставшиеся
+    от прерванного сжатия, сжимает все несжатые архивы (если установлен
+    zstandard) и оставляет не более MAX_ROTATED_FILES самых новых архивов.
+    """
+    base_name, extension = os.path.splitext(os.path.basename(MEASUREMENTS_FILE))
+    # Имена архивов содержат метку времени, поэтому сортируются по возрасту;
+    # бэкапы по Ctrl+C (*_bp_*) под этот шаблон не попадают
+    pattern = os.path.join(BACKUP_DIR, f"{base_name}_[0-9]*")
+    with _archive_lock:
+        # Пока держим блокировку, ни один .tmp не пишется этим процессом
+        for path in glob.glob(pattern + ".zst.tmp"):
+            try:
+                os.remove(path)
+                logger.info("Удалён незавершённый архив: %s", path)
+            except OSError as error:
+                logger.error("Ошибка удаления %s: %s", path, error)
+        if zstandard is not None:
+            for path in sorted(glob.glob(pattern + extension)):
+                compress_archive(path)
+        archives = sorted(path for path in glob.glob(pattern)
+                          if not path.endswith(".tmp"))
+        for path in archives[:-MAX_ROTATED_FILES]:
+            try:
+                os.remove(path)
+                logger.info("Удалён старый архив: %s", path)
+            except OSError as error:
+                logger.error("Ошибка удаления %s: %s", path, error)
 
 
 def backup_files() -> None:
@@ -87,16 +412,32 @@ def backup_files() -> None:
 
     Для каждого файла (bracelets, measurements, td_data) создаётся копия в
     директории BACKUP_DIR с добавлением временной метки.
+
+    TD_DATA_FILE всегда подменяется целиком через os.replace, поэтому
+    вместо копии для него создаётся жёсткая ссылка. Журнал измерений только
+    дописывается: он тоже связывается ссылкой, а в имя бэкапа добавляется
+    его размер в байтах — всё, что дальше этой границы, к снимку не
+    относится. bracelets.json правится вручную и всегда копируется. Если
+    ссылку создать нельзя (другая ФС, нет поддержки), файл копируется.
     """
     os.makedirs(BACKUP_DIR, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     for filename in [BRACELETS_FILE, MEASUREMENTS_FILE, TD_DATA_FILE]:
         if os.path.exists(filename):
-            base_name = os.path.splitext(filename)[0]
-            backup_filename = f"{base_name}_bp_{timestamp}.json"
+            base_name, extension = os.path.splitext(filename)
+            backup_filename = f"{base_name}_bp_{timestamp}{extension}"
+            if filename == MEASUREMENTS_FILE:
+                backup_filename = (f"{base_name}_bp_{timestamp}_"
+                                   f"{os.path.getsize(filename)}b{extension}")
             backup_path = os.path.join(BACKUP_DIR, backup_filename)
             try:
-                shutil.copy(filename, backup_path)
+                if filename == BRACELETS_FILE:
+                    shutil.copy(filename, backup_path)
+                else:
+                    try:
+                        os.link(filename, backup_path)
+                    except OSError:
+                        shutil.copy(filename, backup_path)
                 logger.info("Бэкап: %s -> %s", filename, backup_path)
             except (OSError, IOError) as error:
                 logger.error("Ошибка копирования %s: %s", filename, error)
@@ -104,128 +445,222 @@ def backup_files() -> None:
             logger.warning("Файл %s не найден", filename)
 
 
-def handle_fetch_error(
-    device_log: str,
-    error: Exception,
-    start_time: datetime,
-    end_time: Optional[datetime]
-) -> Tuple[List[Measurement], datetime, Optional[datetime]]:
+def handle_fetch_error(device_log: str, error: Exception) -> None:
     """Обрабатывает ошибки запроса данных.
 
     Args:
         device_log: Форматированная строка для идентификации устройства.
         error: Возникшая ошибка.
-        start_time: Время начала запроса.
-        end_time: Время окончания запроса (может быть None).
 
     Returns:
-        Кортеж: пустой список измерений, start_time и end_time.
+        None вместо пакета измерений.
     """
     logger.error("%s Ошибка: %s", device_log, error)
-    return [], start_time, end_time
+    return None
 
 
-def get_status_color(status_code: int) -> str:
-    """Возвращает ANSI цвет для статуса ответа HTTP.
+def format_log_prefix(bracelet: Dict) -> str:
+    """Формирует префикс для логирования: имя устройства и последние 6 символов MAC.
 
     Args:
-        status_code: Код ответа HTTP.
+        bracelet: Словарь с данными браслета.
 
     Returns:
-        ANSI строка цвета.
+        Строка вида "[имя XX:XX]" или "[Без MAC]".
     """
-    if status_code == 200:
-        return "\033[36m"  # Синий
-    elif status_code == 404:
-        return "\033[33m"  # Желтый
-    else:
-        return "\033[0m"   # Сброс
+    device_name = bracelet.get("name", "Без имени")
+    mac_address = bracelet.get("mac_address", "")
+    return f"[{device_name} {mac_address[-6:]}]" if mac_address else "[Без MAC]"
 
 
-def fetch_data(
+def parse_response(
+    data: Dict,
     session_name: str,
     bracelet: Dict,
-    start_time: datetime,
-    end_time: datetime
-) -> Tuple[List[Measurement], datetime, Optional[datetime]]:
+    log_prefix: str
+) -> Optional[MeasurementBatch]:
+    """Преобразует ответ сервера для одного браслета в пакет измерений.
+
+    Args:
+        data: Декодированный JSON-ответ сервера для браслета.
+        session_name: Название сессии.
+        bracelet: Словарь с данными браслета.
+        log_prefix: Префикс для логирования.
+
+    Returns:
+        Пакет измерений или None, если данных нет.
+    """
+    device_name = bracelet.get("name", "Без имени")
+    mac_address = bracelet.get("mac_address", "")
+
+    if data.get("message") == "No data found for the specified device.":
+        logger.info("%s Данные не найдены", log_prefix)
+        return None
+
+    if not any(data.get(key) for key in ["hr", "lf_hf_ratio", "rmssd", "sdrr", "si"]):
+        logger.warning("%s Пустой набор данных", log_prefix)
+        return None
+
+    try:
+        session_val: Union[int, str] = int(session_name)
+    except ValueError:
+        session_val = session_name
+
+    columns = [data.get(key) or [] for key in
+               ("time", "hr", "lf_hf_ratio", "rmssd", "sdrr", "si")]
+    # Как и при построчной сборке через zip, лишние хвосты столбцов отбрасываются
+    count = min(len(column) for column in columns)
+    if any(len(column) != count for column in columns):
+        columns = [column[:count] for column in columns]
+    timestamps, hrs, lf_hfs, rmssds, sdrrs, sis = columns
+    # Потребители ждут метки без долей секунды; формат в ответе единый,
+    # поэтому позицию точки ищем только в первой метке и дальше режем срезом
+    if timestamps:
+        cut = timestamps[0].find(".")
+        if cut != -1:
+            timestamps = [ts[:cut] for ts in timestamps]
+    measurements: MeasurementBatch = {
+        "session": session_val,
+        "device_mac": mac_address,
+        "device_name": device_name,
+        "timestamp": timestamps,
+        "hr": hrs,
+        "lf_hf_ratio": lf_hfs,
+        "rmssd": rmssds,
+        "sdrr": sdrrs,
+        "si": sis,
+    }
+    logger.info("%s Получено %d измерений", log_prefix, count)
+    return measurements if count else None
+
+
+async def fetch_data(
+    http_session: aiohttp.ClientSession,
+    session_name: str,
+    bracelet: Dict,
+    s_start: str,
+    s_end: str
+) -> Optional[MeasurementBatch]:
     """Запрашивает данные с сервера для одного браслета.
 
     Args:
+        http_session: Общая HTTP-сессия с пулом keep-alive соединений.
         session_name: Название сессии для формирования имени.
         bracelet: Словарь с данными браслета.
-        start_time: Начало окна запроса.
-        end_time: Конец окна запроса.
+        s_start: Начало окна запроса в формате API.
+        s_end: Конец окна запроса в формате API.
 
     Returns:
-        Кортеж: (список измерений, время начала запроса, время окончания запроса).
+        Пакет измерений или None. Измерения в пакете упорядочены по времени
+        в том порядке, в каком их вернул сервер.
     """
-    device_name = bracelet.get("name", "Без имени")
     mac_address = bracelet.get("mac_address", "")
-    # Формирование префикса для логирования: Имя устройства и последние 6 символов MAC
-    log_prefix = f"[{device_name} {mac_address[-6:]}]" if mac_address else "[Без MAC]"
-    start_request_time = datetime.now(MY_TZ)
-    end_request_time = None
+    log_prefix = format_log_prefix(bracelet)
 
     # Если MAC-адрес не задан, пропускаем этот запрос
     if not mac_address:
         logger.warning("%s Пропущен запрос: нет MAC", log_prefix)
-        return [], start_request_time, end_request_time
+        return None
 
-    # Форматируем временные метки для передачи в параметры запроса
-    s_start = start_time.strftime("%Y-%m-%d-%H-%M-%S")
-    s_end = end_time.strftime("%Y-%m-%d-%H-%M-%S")
     query_device_name = f"{session_name}_{mac_address}"
     params = {"device_name": query_device_name, "start": s_start, "end": s_end}
 
-    query_string = urllib.parse.urlencode(params)
-    full_url = f"{API_URL}?{query_string}"
-    logger.info("%s Запрос: %s", log_prefix, full_url)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s Запрос URL: %s?%s", log_prefix,
+                     API_URL, urllib.parse.urlencode(params))
 
-    try:
-        response = requests.get(API_URL, params=params, timeout=10)
-        end_request_time = datetime.now(MY_TZ)
-        logger.info("%s%s Код ответа: %s\033[0m",
-                    log_prefix, get_status_color(response.status_code), response.status_code)
-        logger.debug("%s URL: %s", log_prefix, response.url)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug("%s Данные: %s", log_prefix, json.dumps(data, indent=2))
-    except (requests.RequestException, json.JSONDecodeError) as error:
-        return handle_fetch_error(log_prefix, error, start_request_time, end_request_time)
+    for attempt in range(FETCH_RETRIES + 1):
+        try:
+            async with http_session.get(
+                API_URL, params=params
+            ) as response:
+                logger.info("%s%s Код ответа: %s\033[0m", log_prefix,
+                            _STATUS_COLORS.get(response.status, "\033[0m"),
+                            response.status)
+                logger.debug("%s URL: %s", log_prefix, response.url)
+                response.raise_for_status()
+                # Разбираем байты напрямую, без определения кодировки и
+                # декодирования в str внутри aiohttp
+                data = orjson.loads(await response.read())
+            break
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as error:
+            # Сетевые сбои повторяем с экспоненциальной задержкой
+            if attempt == FETCH_RETRIES:
+                return handle_fetch_error(log_prefix, error)
+            logger.warning("%s Повтор запроса (%d/%d): %s",
+                           log_prefix, attempt + 1, FETCH_RETRIES, error)
+            await asyncio.sleep(FETCH_RETRY_BACKOFF_SEC * 2 ** attempt)
+        except (aiohttp.ClientError, json.JSONDecodeError) as error:
+            return handle_fetch_error(log_prefix, error)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s Данные: %s", log_prefix,
+                     orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+
+    return parse_response(data, session_name, bracelet, log_prefix)
+
+
+async def fetch_data_bulk(
+    http_session: aiohttp.ClientSession,
+    session_name: str,
+    bracelets: List[Dict],
+    s_start: str,
+    s_end: str
+) -> Optional[Dict[str, Optional[MeasurementBatch]]]:
+    """Запрашивает данные для всех браслетов одним пакетным запросом.
 
-    if data.get("message") == "No data found for the specified device.":
-        logger.info("%s Данные не найдены", log_prefix)
-        return [], start_request_time, end_request_time
+    Args:
+        http_session: Общая HTTP-сессия с пулом keep-alive соединений.
+        session_name: Название сессии для формирования имён.
+        bracelets: Список браслетов с заданным MAC-адресом.
+        s_start: Начало окна запроса в формате API.
+        s_end: Конец окна запроса в формате API.
 
-    if not any(data.get(key) for key in ["hr", "lf_hf_ratio", "rmssd", "sdrr", "si"]):
-        logger.warning("%s Пустой набор данных", log_prefix)
-        return [], start_request_time, end_request_time
+    Returns:
+        Словарь пакетов измерений по MAC или None, если пакетный запрос не
+        удался и данные этого цикла нужно запросить по браслетам. Ответ 404
+        означает, что сервер не поддерживает пакетный маршрут: тогда он
+        отключается до конца работы.
+    """
+    global bulk_route_available
+    log_prefix = "[Пакет]"
 
-    try:
-        session_val: Union[int, str] = int(session_name)
-    except ValueError:
-        session_val = session_name
+    query_device_names = ",".join(
+        f"{session_name}_{b['mac_address']}" for b in bracelets)
+    params = {"device_name": query_device_names, "start": s_start, "end": s_end}
+    logger.info("%s Запрос для %d браслетов: %s",
+                log_prefix, len(bracelets), API_BULK_URL)
 
-    measurements: List[Measurement] = [
-        {
-            "session": session_val,
-            "device_mac": mac_address,
-            "device_name": device_name,
-            "timestamp": ts,
-            "hr": hr,
-            "lf_hf_ratio": lf_hf,
-            "rmssd": rmssd,
-            "sdrr": sdrr,
-            "si": si,
-        }
-        for hr, lf_hf, rmssd, sdrr, si, ts in zip(
-            data.get("hr", []), data.get("lf_hf_ratio", []),
-            data.get("rmssd", []), data.get("sdrr", []),
-            data.get("si", []), data.get("time", [])
-        )
-    ]
-    logger.info("%s Получено %d измерений", log_prefix, len(measurements))
-    return measurements, start_request_time, end_request_time
+    try:
+        async with http_session.get(
+            API_BULK_URL, params=params
+        ) as response:
+            logger.info("%s%s Код ответа: %s\033[0m", log_prefix,
+                        _STATUS_COLORS.get(response.status, "\033[0m"),
+                        response.status)
+            if response.status == 404:
+                bulk_route_available = False
+                logger.warning(
+                    "Пакетный маршрут недоступен, переход на запросы по браслетам")
+                return None
+            response.raise_for_status()
+            payload = orjson.loads(await response.read())
+    except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as error:
+        logger.error("%s Ошибка: %s, запрос по браслетам", log_prefix, error)
+        return None
+
+    if not isinstance(payload, dict):
+        logger.error("%s Неожиданный ответ (%s), запрос по браслетам",
+                     log_prefix, type(payload).__name__)
+        return None
+
+    results: Dict[str, Optional[MeasurementBatch]] = {}
+    for bracelet in bracelets:
+        mac_address = bracelet["mac_address"]
+        data = payload.get(mac_address)
+        results[mac_address] = parse_response(
+            data if isinstance(data, dict) else {}, session_name, bracelet,
+            format_log_prefix(bracelet))
+    return results
 
 
 def load_bracelets() -> List[Dict]:
@@ -235,8 +670,8 @@ def load_bracelets() -> List[Dict]:
         Список словарей с информацией о браслетах, обрабатываемых только если 'process' True.
     """
     try:
-        with open(BRACELETS_FILE, "r", encoding="utf-8") as file:
-            bracelets = json.load(file)
+        with open(BRACELETS_FILE, "rb") as file:
+            bracelets = orjson.loads(file.read())
         filtered_bracelets = [
             b for b in bracelets if b.get("mac_address") and b.get("process", False) is True
         ]
@@ -246,13 +681,33 @@ def load_bracelets() -> List[Dict]:
             logger.info(" - %s (%s)", bracelet.get("name", "Без имени"),
                         bracelet.get("mac_address", "Без MAC"))
         return filtered_bracelets
-    except (FileNotFoundError, json.JSONDecodeError, PermissionError) as error:
+    except (FileNotFoundError, json.JSONDecodeError, orjson.JSONDecodeError,
+            PermissionError) as error:
         logger.error("Ошибка загрузки %s: %s", BRACELETS_FILE, error)
         sys.exit(1)
 
 
+# Заголовки и ширины столбцов таблицы цикла; начиная с HR — числовые
+_TABLE_HEADERS = ("Mark", "Time", "Device", "MAC",
+                  "HR", "LF/HF", "RMSSD", "SDRR", "SI")
+_COL_WIDTHS = (8, 23, 20, 17, 5, 7, 6, 6, 5)
+_FIRST_NUMERIC_COL = 4
+
+
+def _fmt_row(values: Tuple) -> str:
+    """Форматирует строку таблицы: текст по левому краю, числа по правому."""
+    return "  ".join(
+        str(value).ljust(width) if index < _FIRST_NUMERIC_COL else str(value).rjust(width)
+        for index, (value, width) in enumerate(zip(values, _COL_WIDTHS))
+    ).rstrip()
+
+
+_TABLE_HEAD = (_fmt_row(_TABLE_HEADERS) + "\n"
+               + "  ".join("-" * width for width in _COL_WIDTHS))
+
+
 def format_table(
-    measurements: List[Measurement],
+    measurements: List[MeasurementBatch],
     s_start: str,
     s_end: str,
     s_received: str
@@ -262,7 +717,7 @@ def format_table(
     от разных устройств.
 
     Args:
-        measurements: Список измерений нового формата.
+        measurements: Список пакетов измерений.
         s_start: Строковое представление начала окна.
         s_end: Строковое представление конца окна.
         s_received: Строковое представление последнего ответа.
@@ -270,69 +725,64 @@ def format_table(
     Returns:
         Строка, содержащая табличное представление данных.
     """
-    from collections import defaultdict  # если не импортирован глобально
-    from tabulate import tabulate       # если не импортирован глобально
-
-    headers = ["Mark", "Time", "Device", "MAC",
-               "HR", "LF/HF", "RMSSD", "SDRR", "SI"]
-
-    # Первая строка: информация о начале окна
-    table = [
-        ["Start", s_start, "", "", "", "", "", "", ""]
-    ]
+    # Заголовок и первая строка: информация о начале окна
+    lines = [_TABLE_HEAD, _fmt_row(("Start", s_start))]
 
     # Группируем измерения по устройствам (по имени и MAC)
     grouped = defaultdict(list)
-    for m in measurements:
-        key = (m["device_name"], m["device_mac"])
-        grouped[key].append(m)
+    for batch in measurements:
+        key = (batch["device_name"], batch["device_mac"])
+        grouped[key].extend(zip(
+            batch["timestamp"], batch["hr"], batch["lf_hf_ratio"],
+            batch["rmssd"], batch["sdrr"], batch["si"]
+        ))
 
     mark = 1
-    sorted_keys = sorted(grouped.keys(), key=lambda x: x[0])
-    for key in sorted_keys:
-        # Сортируем данные в группе по времени
-        grp = sorted(grouped[key], key=lambda x: x["timestamp"])
-        for m in grp:
-            row = [
-                str(mark),
-                m["timestamp"],
-                m["device_name"],
-                m["device_mac"],
-                m["hr"] if m["hr"] is not None else "-",
-                m["lf_hf_ratio"] if m["lf_hf_ratio"] is not None else "-",
-                m["rmssd"] if m["rmssd"] is not None else "-",
-                m["sdrr"] if m["sdrr"] is not None else "-",
-                m["si"] if m["si"] is not None else "-"
-            ]
-            table.append(row)
+    # Кортежи (имя, MAC) сортируются по имени, затем по MAC
+    for key in sorted(grouped):
+        device_name, device_mac = key
+        # Сервер возвращает измерения по возрастанию времени, повторная
+        # сортировка группы не нужна
+        for ts, hr, lf_hf, rmssd, sdrr, si in grouped[key]:
+            lines.append(_fmt_row((
+                mark,
+                ts,
+                device_name,
+                device_mac,
+                hr if hr is not None else "-",
+                lf_hf if lf_hf is not None else "-",
+                rmssd if rmssd is not None else "-",
+                sdrr if sdrr is not None else "-",
+                si if si is not None else "-"
+            )))
             mark += 1
         # Добавляем пустую строку между группами
-        table.append([""] * len(headers))
+        lines.append("")
 
     # Добавляем строки окончания окна и время последнего ответа
-    table.append(["End", s_end, "", "", "", "", "", "", ""])
-    table.append(["Received", s_received, "", "", "", "", "", "", ""])
+    lines.append(_fmt_row(("End", s_end)))
+    lines.append(_fmt_row(("Received", s_received)))
 
-    return tabulate(table, headers=headers, tablefmt="simple")
+    return "\n".join(lines)
 
 
-def fetch_and_process_data(
+async def fetch_and_process_data(
+    http_session: aiohttp.ClientSession,
     session_name: str,
     bracelets: List[Dict],
-    current_start: Optional[datetime],
-    executor: ThreadPoolExecutor
-) -> Tuple[List[Measurement], List[Measurement], datetime, datetime, datetime]:
-    """Параллельно запрашивает данные для всех браслетов.
+    current_start: Optional[datetime]
+) -> Tuple[List[MeasurementBatch], List[MeasurementBatch], datetime, datetime, datetime]:
+    """Конкурентно запрашивает данные для всех браслетов.
 
     Вычисляет общее окно времени и передаёт его в запросы. Собирает
     результаты, формирует словарь последних измерений, а также возвращает
     время последнего полученного ответа от сервера.
 
     Args:
+        http_session: Общая HTTP-сессия для всех запросов цикла.
         session_name: Название сессии.
         bracelets: Список браслетов.
         current_start: Начало окна запроса (если задано).
-        executor: Пул для параллельного выполнения запросов.
 
     Returns:
         Кортеж из:
@@ -341,9 +791,8 @@ def fetch_and_process_data(
           - start_time и end_time для запроса,
           - времени последнего ответа от сервера.
     """
-    all_measurements: List[Measurement] = []
-    td_data: List[Measurement] = []
-    last_received: Optional[datetime] = None
+    all_measurements: List[MeasurementBatch] = []
+    td_data: List[MeasurementBatch] = []
 
     if current_start:
         start_time = current_start
@@ -354,83 +803,152 @@ def fetch_and_process_data(
         end_time = now
 
     logger.info("Расчет окна: start = %s, end = %s", start_time, end_time)
-    logger.info("Запуск пула для %d браслетов", len(bracelets))
-
-    futures = {
-        executor.submit(fetch_data, session_name, b, start_time, end_time): b
-        for b in bracelets if b.get("mac_address") and b.get("process", False) is True
-    }
+    # Метки окна общие для всех браслетов цикла: форматируем их один раз
+    s_start = _fmt_ts(start_time)
+    s_end = _fmt_ts(end_time)
+    logger.info("Запуск запросов для %d браслетов", len(bracelets))
+
+    # Список уже отфильтрован в load_bracelets: повторная проверка не нужна
+    targets = bracelets
+    results: Optional[List] = None
+    if bulk_route_available and targets:
+        # При любой ошибке пакетного запроса данные цикла запрашиваются по браслетам
+        bulk = await fetch_data_bulk(
+            http_session, session_name, targets, s_start, s_end)
+        if bulk is not None:
+            results = [bulk.get(b["mac_address"]) for b in targets]
+    if results is None:
+        tasks = [
+            asyncio.create_task(
+                fetch_data(http_session, session_name, b, s_start, s_end))
+            for b in targets
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Все ответы получены: время последнего из них — текущее время
+    last_received = datetime.now(MY_TZ)
 
-    for future in as_completed(futures):
-        bracelet = futures[future]
-        device_name = bracelet.get("name", "Без имени")
-        mac_address = bracelet.get("mac_address", "")
-        log_prefix = f"[{device_name} {mac_address[-6:]}]" if mac_address else "[Без MAC]"
-        logger.info("%s Ожидание завершения задачи...", log_prefix)
+    for bracelet, result in zip(targets, results):
+        log_prefix = format_log_prefix(bracelet)
         try:
-            measurements, req_start, req_end = future.result()
+            if isinstance(result, BaseException):
+                raise result
+            measurements = result
             if measurements:
                 logger.info("%s Получены данные: %d измерений",
-                            log_prefix, len(measurements))
-                all_measurements.extend(measurements)
-                td_data.extend(measurements)
+                            log_prefix, batch_size(measurements))
+                all_measurements.append(measurements)
+                td_data.append(measurements)
                 logger.info("%s Последнее измерение сохранено", log_prefix)
-            if req_end and (last_received is None or req_end > last_received):
-                last_received = req_end
-                logger.info(
-                    "%s Обновлено время последнего ответа сервера: %s", log_prefix, last_received)
         except Exception as error:
             logger.error("%s Ошибка обработки: %s\n%s", log_prefix, error,
                          "".join(traceback.format_tb(error.__traceback__)))
-    if last_received is None:
-        last_received = end_time
-        logger.warning(
-            "Не удалось получить ни одного ответа от сервера, используем end_time: %s", last_received)
     return all_measurements, td_data, start_time, end_time, last_received
 
 
-def save_data(
-    history: List[Measurement],
-    new_measurements: List[Measurement],
-    td_data: List[Measurement],
+def _save_data_sync(
+    new_measurements: List[MeasurementBatch],
+    td_data: List[MeasurementBatch],
     s_start: str,
     s_end: str,
     s_received: str
 ) -> None:
-    """Сохраняет измерения в историю и обновляет файлы.
+    """Дописывает новые измерения в журнал и обновляет файлы.
 
-    Если новые измерения есть, они добавляются к истории, затем
-    данные записываются в файл, и выводится таблица с разделением данных по устройствам.
+    Если новые измерения есть, они дописываются в конец MEASUREMENTS_FILE
+    (по одной записи на строку; при смене часа журнал предварительно
+    переносится в архив), и, если вывод идёт в терминал, выводится
+    таблица с разделением данных по устройствам. TD_DATA_FILE перезаписывается атомарно и только при
+    изменении содержимого.
 
     Args:
-        history: Существующая история измерений.
         new_measurements: Новые измерения за цикл.
         td_data: Словарь последних значений для каждого устройства.
         s_start: Строковое представление начала окна.
         s_end: Строковое представление конца окна.
         s_received: Строковое представление последнего ответа.
     """
+    global last_td_digest
     if new_measurements:
-        history.extend(new_measurements)
-        with open(MEASUREMENTS_FILE, "w", encoding="utf-8") as file:
-            json.dump(history, file, indent=2)
-        logger.info("Добавлено %d записей в %s", len(
-            new_measurements), MEASUREMENTS_FILE)
-        table = format_table(new_measurements, s_start, s_end, s_received)
-        print(f"\n{table}\n")
+        rotate_measurements()
+        append_measurements(new_measurements)
+        logger.info("Добавлено %d записей в %s",
+                    sum(map(batch_size, new_measurements)), MEASUREMENTS_FILE)
+        # Таблица нужна только в терминале: при выводе в файл/канал не строим её
+        if sys.stdout.isatty():
+            table = format_table(new_measurements, s_start, s_end, s_received)
+            print(f"\n{table}\n")
     else:
         logger.warning("Нет новых измерений, таблица не выведена")
-    with open(TD_DATA_FILE, "w", encoding="utf-8") as file:
-        json.dump(td_data, file, indent=2)
+    payload = orjson.dumps(list(iter_rows(td_data)))
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    if digest == last_td_digest:
+        logger.debug("Данные %s не изменились, запись пропущена", TD_DATA_FILE)
+        return
+    write_atomic(TD_DATA_FILE, payload)
+    last_td_digest = digest
+
+
+async def save_data(
+    new_measurements: List[MeasurementBatch],
+    td_data: List[MeasurementBatch],
+    s_start: str,
+    s_end: str,
+    s_received: str
+) -> None:
+    """Сохраняет данные цикла в отдельном потоке, не блокируя цикл событий.
+
+    Аргументы совпадают с _save_data_sync.
+    """
+    await asyncio.to_thread(
+        _save_data_sync, new_measurements, td_data, s_start, s_end, s_received)
+
+
+def parse_fixed_start(raw: str) -> datetime:
+    """Разбирает строку FIXED_START во время с часовым поясом MY_TZ.
+
+    Результат кэшируется: повторный разбор выполняется только если строка
+    изменилась (например, при перезагрузке конфигурации).
+
+    Args:
+        raw: Строка времени в формате TS_FMT.
+
+    Returns:
+        Время начала окна запроса.
+
+    Raises:
+        ValueError: Если строка не соответствует формату.
+    """
+    global _fixed_start_cache
+    if _fixed_start_cache is None or _fixed_start_cache[0] is not raw:
+        parsed = datetime.strptime(raw, TS_FMT).replace(tzinfo=MY_TZ)
+        _fixed_start_cache = (raw, parsed)
+    return _fixed_start_cache[1]
 
 
 def main() -> None:
     """Запускает основной цикл получения данных с сервера."""
+    global rotate_max_bytes
     print("")
     parser = argparse.ArgumentParser(
         description="Получение данных с сервера")
     parser.add_argument("--session_name", help="Название сессии")
+    parser.add_argument(
+        "--compact", metavar="FILE",
+        help="Собрать журнал измерений в JSON-массив FILE и выйти")
+    parser.add_argument(
+        "--max-workers", type=int, metavar="N",
+        help=f"Число одновременных запросов (по умолчанию min(браслеты, {MAX_CONNECTIONS}))")
+    parser.add_argument(
+        "--rotate-mb", type=float, default=ROTATE_SIZE_MB, metavar="MB",
+        help=f"Размер журнала измерений для ротации (по умолчанию {ROTATE_SIZE_MB})")
     args = parser.parse_args()
+    rotate_max_bytes = int(args.rotate_mb * 1024 * 1024)
+    if args.compact:
+        compact_measurements(args.compact)
+        return
+    # Дожимаем архивы, оставшиеся несжатыми после прошлого запуска
+    threading.Thread(target=maintain_archives, name="maintain-archives",
+                     daemon=True).start()
     session_name = (args.session_name or input(
         "Введите название сессии: ").strip())
     if not session_name:
@@ -444,49 +962,88 @@ def main() -> None:
     current_start = None
     if USE_FIXED_START:
         try:
-            current_start = datetime.strptime(
-                FIXED_START, "%Y-%m-%d-%H-%M-%S").replace(tzinfo=MY_TZ)
+            current_start = parse_fixed_start(FIXED_START)
             logger.info("Фиксированное время: %s", FIXED_START)
         except ValueError as error:
             logger.error("Ошибка формата FIXED_START: %s", error)
             sys.exit(1)
-    try:
-        with open(MEASUREMENTS_FILE, "r", encoding="utf-8") as file:
-            history: List[Measurement] = json.load(file)
-        logger.info("Загружено %d измерений", len(history))
-    except (FileNotFoundError, json.JSONDecodeError):
-        history = []
-        logger.info("Файл %s не найден, создан пустой", MEASUREMENTS_FILE)
-    max_workers = min(len(bracelets), 6)
-    logger.info("Пул потоков: %d рабочих", max_workers)
-    executor = ThreadPoolExecutor(max_workers=max_workers)
     print("")
+    max_workers = args.max_workers or min(len(bracelets), MAX_CONNECTIONS)
+    logger.info("Одновременных запросов: %d", max_workers)
+    asyncio.run(main_async(session_name, bracelets, current_start, max_workers))
+
+
+async def main_async(
+    session_name: str,
+    bracelets: List[Dict],
+    current_start: Optional[datetime],
+    max_workers: int
+) -> None:
+    """Выполняет цикл опроса сервера в одной HTTP-сессии.
+
+    Сессия создаётся один раз и переиспользуется во всех циклах, чтобы
+    соединения с сервером оставались открытыми между запросами.
+
+    Ctrl+C не прерывает цикл посреди записи: он лишь выставляет флаг
+    остановки, текущий цикл дописывается до конца, после чего сессия и
+    журнал закрываются и создаются бэкапы. Повторный Ctrl+C завершает
+    работу сразу, как раньше.
+
+    Args:
+        session_name: Название сессии.
+        bracelets: Список браслетов.
+        current_start: Начало окна запроса (если задано).
+        max_workers: Размер пула соединений (число одновременных запросов).
+    """
+    stop_event = asyncio.Event()
+
+    def request_stop() -> None:
+        if stop_event.is_set():
+            signal_handler(signal.SIGINT, None)
+        logger.info("Ctrl+C: завершение после текущего цикла")
+        stop_event.set()
+
     try:
-        while True:
-            logger.info(
-                "\033[32mНовый цикл для %d браслетов\033[0m", len(bracelets))
-            new_measurements, td_data, start_time, end_time, last_received = fetch_and_process_data(
-                session_name, bracelets, current_start, executor)
-            s_start = start_time.strftime(
-                "%Y-%m-%d %H:%M:%S.%f")[:-3] if start_time else "-"
-            s_end = end_time.strftime(
-                "%Y-%m-%d %H:%M:%S.%f")[:-3] if end_time else "-"
-            s_received = last_received.strftime(
-                "%Y-%m-%d %H:%M:%S.%f")[:-3] if last_received else "-"
-            save_data(history, new_measurements, td_data,
-                      s_start, s_end, s_received)
-            logger.info("Цикл завершен: %d записей", len(new_measurements))
-            print("")
-            if USE_FIXED_START and current_start:
-                current_start += timedelta(seconds=TIME_FETCH_SEC)
-            time.sleep(FETCH_INTERVAL_SEC)
-    except KeyboardInterrupt:
-        logger.info("Завершение: закрытие пула")
-        executor.shutdown(wait=True)
-        raise
-    finally:
-        logger.info("Закрытие пула потоков")
-        executor.shutdown(wait=True)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGINT, request_stop)
+    except NotImplementedError:
+        # На Windows остаётся signal_handler с немедленным выходом
+        pass
+    connector = aiohttp.TCPConnector(
+        limit=max_workers, keepalive_timeout=KEEPALIVE_TIMEOUT_SEC)
+    total_count = 0
+    # Таймаут задаётся один раз для сессии, а не создаётся на каждый запрос
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SEC)
+    async with aiohttp.ClientSession(
+            connector=connector, headers=HTTP_HEADERS,
+            timeout=timeout) as http_session:
+        try:
+            while not stop_event.is_set():
+                logger.info(
+                    "\033[32mНовый цикл для %d браслетов\033[0m", len(bracelets))
+                new_measurements, td_data, start_time, end_time, last_received = \
+                    await fetch_and_process_data(
+                        http_session, session_name, bracelets, current_start)
+                s_start = _fmt_ts_ms(start_time) if start_time else "-"
+                s_end = _fmt_ts_ms(end_time) if end_time else "-"
+                s_received = _fmt_ts_ms(last_received) if last_received else "-"
+                await save_data(new_measurements, td_data, s_start, s_end, s_received)
+                new_count = sum(map(batch_size, new_measurements))
+                total_count += new_count
+                logger.info("Цикл завершен: %d записей (всего за запуск: %d)",
+                            new_count, total_count)
+                print("")
+                if USE_FIXED_START and current_start:
+                    current_start += timedelta(seconds=TIME_FETCH_SEC)
+                try:
+                    # Пауза между циклами прерывается сразу по Ctrl+C
+                    await asyncio.wait_for(stop_event.wait(), FETCH_INTERVAL_SEC)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            logger.info("Закрытие HTTP-сессии")
+            close_measurements()
+    logger.info("Ctrl+C: создание бэкапов")
+    backup_files()
 
 
 def signal_handler(_sig: int, _frame: Optional[object]) -> None:
@@ -498,6 +1055,7 @@ def signal_handler(_sig: int, _frame: Optional[object]) -> None:
 
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
+    migrate_measurements()
     ensure_file(BRACELETS_FILE, DEFAULT_BRACELETS)
     ensure_file(MEASUREMENTS_FILE, DEFAULT_MEASUREMENTS)
     ensure_file(TD_DATA_FILE, DEFAULT_TD_DATA)
@@ -1,11 +1,11 @@
 import signal
 import sys
+import threading
 from rich.console import Console
 from rich.layout import Layout
 from rich.panel import Panel
 from rich.text import Text
 from rich.live import Live
-import time
 
 
 def create_six_column_layout(console):
@@ -42,6 +42,14 @@ def create_six_column_layout(console):
     return layout
 
 
+def resize_six_column_layout(layout, console):
+    # Only the column widths depend on the console size: adjust them in place
+    # instead of rebuilding the panels
+    min_column_width = max(10, console.width // 8)
+    for i in range(1, 7):
+        layout[f"col{i}"].minimum_size = min_column_width
+
+
 def main():
     console = Console()
 
@@ -56,17 +64,30 @@ def main():
         # Register Ctrl+C handler
         signal.signal(signal.SIGINT, signal_handler)
 
+        # Wake up only when the terminal is resized (SIGWINCH); where the
+        # signal is unavailable (Windows), fall back to polling
+        resize_event = threading.Event()
+        if hasattr(signal, "SIGWINCH"):
+            signal.signal(signal.SIGWINCH, lambda sig, frame: resize_event.set())
+            wait_timeout = 60
+        else:
+            wait_timeout = 0.1
+
+        # Build the layout once; resizes only update column widths
+        layout = create_six_column_layout(console)
+
         # Main loop to check for window resize
         last_size = console.size
         while True:
+            resize_event.wait(wait_timeout)
+            resize_event.clear()
             current_size = console.size
             if current_size != last_size:
                 # Update layout on resize
-                layout = create_six_column_layout(console)
+                resize_six_column_layout(layout, console)
                 live.update(layout)
                 last_size = current_size
             live.refresh()
-            time.sleep(0.1)  # Small delay to reduce CPU usage
 
 
 if __name__ == "__main__":
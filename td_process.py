@@ -5,13 +5,29 @@
 
 import json
 import re
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    # TouchDesigner's bundled Python may not ship orjson
+    json_loads = json.loads
+
+try:
+    import msgspec
+except ImportError:
+    # Optional: without msgspec measurements are parsed item by item
+    msgspec = None
 
 # region [Constants]
 PARAMS = ['hr', 'lf_hf_ratio', 'rmssd', 'sdrr', 'si']
 MAC_PATTERN = re.compile(
     r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$', re.IGNORECASE)
+MAC_CACHE_SIZE = 1024
+HEADER = ['Channel'] + [str(i) for i in range(60)]
 # endregion
 
 # region [Type Definitions]
@@ -24,26 +40,96 @@ class Device:
         self.process = process
 
 
-class Measurement:
-    def __init__(self, device_mac: str, timestamp: str, values: Dict[str, float]):
-        self.device_mac = device_mac.upper()
-        self.timestamp = timestamp
-        self.values = values
+# Measurements are stored column-wise in a structured array: one row per
+# measurement, MACs interned to ids (see get_mac_id), sec = -1 for rows whose
+# timestamp has no usable seconds field. Values stay float64 so that '%.1f'
+# prints them exactly as before.
+MEASUREMENT_DTYPE = np.dtype(
+    [('mac_id', 'i4'), ('sec', 'i1')] + [(p, 'f8') for p in PARAMS])
+
+
+if msgspec is not None:
+    class MeasurementRecord(msgspec.Struct):
+        """Raw measurement as stored in the data DAT, decoded in one C pass."""
+        device_mac: str
+        timestamp: str
+        # The API sends null for metrics it has no value for; None maps to 0.0
+        hr: Optional[float] = None
+        lf_hf_ratio: Optional[float] = None
+        rmssd: Optional[float] = None
+        sdrr: Optional[float] = None
+        si: Optional[float] = None
+
+    # strict=False coerces numeric strings to floats, as the per-item path does
+    _measurements_decoder = msgspec.json.Decoder(List[MeasurementRecord], strict=False)
 # endregion
 
 
 # region [State]
 _devices_cache = None
 _last_devices_text = None
+_measurements_cache = None
+_last_data_text = None
+_mac_norm_cache: Dict[str, str] = {}
+_mac_ids: Dict[str, int] = {}
+_channel_layout_cache = None
+_channel_layout_devices = None
+_output_inputs = None
+_output_rows = None
 # endregion
 
 
 def validate_mac(mac: str) -> str:
-    """Normalize and validate MAC address format."""
-    mac = mac.upper().replace('-', ':')
-    if not MAC_PATTERN.match(mac):
-        raise ValueError(f"Invalid MAC address format: {mac}")
-    return mac
+    """Normalize and validate MAC address format (valid results are cached)."""
+    cached = _mac_norm_cache.get(mac)
+    if cached is not None:
+        return cached
+
+    normalized = mac.upper().replace('-', ':')
+    if not MAC_PATTERN.match(normalized):
+        raise ValueError(f"Invalid MAC address format: {normalized}")
+
+    if len(_mac_norm_cache) >= MAC_CACHE_SIZE:
+        # FIFO eviction: dicts keep insertion order
+        del _mac_norm_cache[next(iter(_mac_norm_cache))]
+    _mac_norm_cache[mac] = normalized
+    return normalized
+
+
+def get_mac_id(mac: str) -> int:
+    """Return a stable small integer id for a normalized MAC address."""
+    mac_id = _mac_ids.get(mac)
+    if mac_id is None:
+        mac_id = _mac_ids[mac] = len(_mac_ids)
+    return mac_id
+
+
+def timestamp_second(timestamp: str) -> int:
+    """Return the seconds field of "YYYY-MM-DD HH:MM:SS", or -1 if unusable.
+
+    Timestamps are fixed-width, so the field is read directly instead of
+    parsing the whole datetime.
+    """
+    field = timestamp[17:19]
+    if len(field) != 2 or not field.isdigit():
+        return -1
+    sec = int(field)
+    return sec if sec < 60 else -1
+
+
+def metric_value(value) -> float:
+    """Return a metric as float: numbers and numeric strings are converted,
+    anything else (null, missing, non-numeric) counts as 0.0.
+
+    Same rule as the msgspec decoder (strict=False, Optional fields)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+    return 0.0
 
 
 def parse_devices(dvs_text: str) -> List[Device]:
@@ -54,7 +140,7 @@ def parse_devices(dvs_text: str) -> List[Device]:
         return _devices_cache
 
     devices = []
-    for item in json.loads(dvs_text):
+    for item in json_loads(dvs_text):
         try:
             mac = validate_mac(item['mac_address'])
             devices.append(Device(
@@ -70,57 +156,144 @@ def parse_devices(dvs_text: str) -> List[Device]:
     return devices
 
 
-def parse_measurements(data_text: str) -> List[Measurement]:
-    """Parse measurements with error handling."""
-    measurements = []
-    for item in json.loads(data_text):
+def parse_measurements(data_text: str) -> np.ndarray:
+    """Parse and cache measurements into a MEASUREMENT_DTYPE array."""
+    global _measurements_cache, _last_data_text
+
+    if data_text == _last_data_text:
+        return _measurements_cache
+
+    if msgspec is not None:
         try:
-            measurements.append(Measurement(
-                device_mac=validate_mac(item['device_mac']),
-                timestamp=item['timestamp'],
-                values={p: float(item.get(p, 0)) for p in PARAMS}
-            ))
-        except (KeyError, ValueError) as e:
+            records = _measurements_decoder.decode(data_text)
+        except msgspec.DecodeError:
+            # Some item is malformed: fall back to the per-item path below,
+            # which skips and reports only the bad entries
+            records = None
+        if records is not None:
+            rows = []
+            for r in records:
+                try:
+                    mac = validate_mac(r.device_mac)
+                except ValueError as e:
+                    print(f"Measurement error: {e}")
+                    continue
+                values = (r.hr, r.lf_hf_ratio, r.rmssd, r.sdrr, r.si)
+                rows.append((get_mac_id(mac), timestamp_second(r.timestamp),
+                             *(0.0 if v is None else v for v in values)))
+            measurements = np.array(rows, dtype=MEASUREMENT_DTYPE)
+            _measurements_cache = measurements
+            _last_data_text = data_text
+            return measurements
+
+    rows = []
+    for item in json_loads(data_text):
+        mac = item.get('device_mac')
+        timestamp = item.get('timestamp')
+        if mac is None or timestamp is None:
+            print(f"Measurement error: missing device_mac or timestamp in {item}")
+            continue
+        try:
+            mac = validate_mac(mac)
+        except ValueError as e:
             print(f"Measurement error: {e}")
-    return measurements
-
+            continue
+        rows.append((get_mac_id(mac), timestamp_second(timestamp),
+                     *(metric_value(item.get(p)) for p in PARAMS)))
 
-def update_output_table(devices: List[Device], measurements: List[Measurement], output_dat):
-    """Efficient table update with batched operations."""
-    # Prepare header
-    header = ['Channel'] + [str(i) for i in range(60)]
+    measurements = np.array(rows, dtype=MEASUREMENT_DTYPE)
+    _measurements_cache = measurements
+    _last_data_text = data_text
+    return measurements
 
-    # Prepare data matrix
-    device_map = {d.mac: d for d in devices if d.process}
-    channel_data = {}
 
-    # Process measurements
-    for m in measurements:
-        device = device_map.get(m.device_mac)
-        if not device:
-            continue
+def get_channel_layout(devices: List[Device]) -> Tuple[Dict[str, int], Dict[str, List[int]]]:
+    """Return channel name -> row index and MAC -> per-PARAMS row indices.
 
-        try:
-            sec = datetime.strptime(m.timestamp, "%Y-%m-%d %H:%M:%S").second
-            if sec >= 60:
-                continue
-        except ValueError:
-            continue
+    Cached on the identity of the devices list: parse_devices returns the same
+    list object until the devices DAT text changes.
+    """
+    global _channel_layout_cache, _channel_layout_devices
 
-        for param in PARAMS:
-            channel = f"{device.name}_{param}"
-            if channel not in channel_data:
-                channel_data[channel] = [0.0]*60
-            channel_data[channel][sec] = m.values.get(param, 0.0)
+    if devices is _channel_layout_devices:
+        return _channel_layout_cache
 
-    # Prepare rows
-    rows = [header]
-    for channel, values in sorted(channel_data.items()):
-        rows.append([channel] + [f"{v:.1f}" for v in values])
+    device_map = {d.mac: d for d in devices if d.process}
+    # Devices sharing a name share channels: deduplicate before numbering rows
+    channel_idx = {
+        name: i for i, name in enumerate(sorted({
+            f"{d.name}_{p}" for d in device_map.values() for p in PARAMS}))
+    }
+    channels_by_mac = {
+        mac: [channel_idx[f"{d.name}_{p}"] for p in PARAMS]
+        for mac, d in device_map.items()
+    }
+
+    _channel_layout_cache = (channel_idx, channels_by_mac)
+    _channel_layout_devices = devices
+    return _channel_layout_cache
+
+
+def update_output_table(devices: List[Device], measurements: np.ndarray, output_dat):
+    """Efficient table update with batched operations.
+
+    The DAT is rewritten only when its contents would change: inputs are
+    compared by identity (parse_* return cached lists for unchanged text),
+    then the rebuilt rows are compared with the previous snapshot.
+    """
+    global _output_inputs, _output_rows
+
+    if _output_inputs is not None and _output_inputs[0] is devices \
+            and _output_inputs[1] is measurements:
+        return
+
+    # Prepare data matrix: one row per channel, one column per second
+    channel_idx, channels_by_mac = get_channel_layout(devices)
+    matrix = np.zeros((len(channel_idx), 60))
+    used = np.zeros(len(channel_idx), dtype=bool)
+
+    # Channel rows per MAC id (-1 for MACs that are not processed)
+    rows_by_mac_id = np.full((len(_mac_ids), len(PARAMS)), -1, dtype=np.intp)
+    for mac, channels in channels_by_mac.items():
+        mac_id = _mac_ids.get(mac)
+        if mac_id is not None:
+            rows_by_mac_id[mac_id] = channels
+
+    # Keep measurements of processed devices with a usable seconds field;
+    # when several land in the same (channel, second) cell the last one wins.
+    # Devices sharing a name share channels, so cells are keyed by channel row.
+    m = measurements[measurements['sec'] >= 0]
+    channel_rows = rows_by_mac_id[m['mac_id']]
+    keep = channel_rows[:, 0] >= 0
+    m, channel_rows = m[keep], channel_rows[keep]
+    if len(m):
+        cell = channel_rows[:, 0].astype(np.int64) * 60 + m['sec']
+        _, last_in_reversed = np.unique(cell[::-1], return_index=True)
+        last = len(m) - 1 - last_in_reversed
+        m, channel_rows = m[last], channel_rows[last]
+
+    # Scatter each parameter column into its channel rows
+    secs = m['sec']
+    for k, param in enumerate(PARAMS):
+        matrix[channel_rows[:, k], secs] = m[param]
+    used[channel_rows.ravel()] = True
+
+    # Prepare rows (only channels that received data, sorted by name)
+    rows = [HEADER]
+    used_channels = [(name, i) for name, i in channel_idx.items() if used[i]]
+    if used_channels:
+        cells = np.char.mod('%.1f', matrix[[i for _, i in used_channels]]).tolist()
+        for (channel, _), values in zip(used_channels, cells):
+            rows.append([channel] + values)
+
+    _output_inputs = (devices, measurements)
+    if rows == _output_rows:
+        return
 
     # Batch update
     output_dat.clear()
     output_dat.appendRows(rows)
+    _output_rows = rows
 
 
 def process_data():
@@ -16,22 +16,75 @@ TUI Dashboard для отображения графиков данных уст
   - График адаптируется под динамическую ширину терминала.
 """
 
+import bisect
 import json
+import mmap
+import os
+import threading
 import time
 import datetime
 from dataclasses import dataclass, field
+from itertools import groupby
+from operator import itemgetter
 from typing import Any, Dict, List, Optional, Tuple
 
 from rich.console import Console
 from rich.live import Live
 from rich.panel import Panel
+from rich.style import Style
 # используется для построения макета, а не самого графика
 from rich.table import Table
 from rich.text import Text
 from rich import box
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    # Без orjson разбираем stdlib json (он не принимает memoryview)
+    def json_loads(buf: Any) -> Any:
+        return json.loads(bytes(buf))
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    # Без watchdog изменения файла данных замечаются по таймеру обновления
+    FileSystemEventHandler = object
+    Observer = None
+
+DATA_FILE = "td_data.json"
+MMAP_THRESHOLD = 1024 * 1024  # Файлы от 1 МБ читаются через mmap без копии
+
 console = Console()
 
+# Ключ (путь, mtime_ns, размер) последней загрузки и её результат
+_data_cache_key: Optional[Tuple[str, int, int]] = None
+_data_cache: List[Dict[str, Any]] = []
+# Данные, для которых построена последняя группировка, и её результат
+_grouped_for: Optional[List[Dict[str, Any]]] = None
+_grouped_cache: Dict[str, List[Dict[str, Any]]] = {}
+# Неизменяемые панели, закэшированные по ширине (panel_width -> Panel)
+_empty_panel_cache: Dict[int, Panel] = {}
+_reference_panel_cache: Dict[int, Panel] = {}
+# Подписи и оси графика, не зависящие от данных:
+# (drawing_width, plot_height, left_margin) -> шаблон из build_axis_template
+_axis_cache: Dict[Tuple[int, int, int], Tuple[List[Tuple[str, str]], str, str, int, str]] = {}
+# Внешний макет, построенный один раз для grid_layout: (grid_layout, layout, header, grid)
+_layout_cache: Optional[Tuple[Tuple[int, int], Table, Table, Table]] = None
+
+_ts_key = itemgetter("_ts")
+
+# Стили графика создаются один раз, без разбора разметки при каждой отрисовке
+STYLE_HR = Style(color="red")
+STYLE_SI = Style(color="cyan")
+STYLE_X = Style(color="magenta", bold=True)
+
+# Коды клеток графика и их символы и стили: 0 — пусто, HR, SI, наложение HR
+CELL_EMPTY, CELL_HR, CELL_SI, CELL_X = 0, 1, 2, 3
+CELL_CHARS = {CELL_EMPTY: " ", CELL_HR: "*", CELL_SI: "o", CELL_X: "X"}
+CELL_STYLES = {CELL_HR: STYLE_HR, CELL_SI: STYLE_SI, CELL_X: STYLE_X}
+
 
 @dataclass
 class DashboardConfig:
@@ -51,45 +104,165 @@ class DashboardConfig:
     include_reference_panel: bool = False
 
 
-def load_data(file_path: str = "td_data.json") -> List[Dict[str, Any]]:
+def load_data(file_path: str = DATA_FILE) -> List[Dict[str, Any]]:
+    global _data_cache_key, _data_cache
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            return json.load(file)
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+        if key == _data_cache_key:
+            return _data_cache
+        with open(file_path, "rb") as file:
+            if stat.st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf, \
+                        memoryview(buf) as view:
+                    data = json_loads(view)
+            else:
+                data = json_loads(file.read())
+        _data_cache_key, _data_cache = key, data
+        return data
     except Exception as error:
         console.print(f"[red]Ошибка загрузки данных:[/red] {error}")
         return []
 
 
+class DataFileHandler(FileSystemEventHandler):
+    """Поднимает событие, когда файл данных изменён или заменён."""
+
+    def __init__(self, file_path: str, changed: threading.Event) -> None:
+        super().__init__()
+        self.file_path = os.path.abspath(file_path)
+        self.changed = changed
+
+    def on_any_event(self, event: Any) -> None:
+        # main.py пишет td_data.json через временный файл и os.replace,
+        # поэтому нужный путь может оказаться и в dest_path
+        paths = (event.src_path, getattr(event, "dest_path", ""))
+        if any(path and os.path.abspath(path) == self.file_path for path in paths):
+            self.changed.set()
+
+
+def start_data_watcher(file_path: str, changed: threading.Event) -> Optional[Any]:
+    """Запускает наблюдение за файлом данных; без watchdog возвращает None."""
+    if Observer is None:
+        return None
+    observer = Observer()
+    observer.schedule(DataFileHandler(file_path, changed),
+                      os.path.dirname(os.path.abspath(file_path)), recursive=False)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+
 def group_data_by_device(data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Группирует записи по устройствам и сортирует каждую группу по времени.
+    Метка времени разбирается один раз и сохраняется в записи как "_ts"
+    (секунды эпохи); записи с некорректной меткой отбрасываются.
+    Пока load_data возвращает тот же список, повторно используется
+    прежняя группировка.
+    """
+    global _grouped_for, _grouped_cache
+    if data is _grouped_for:
+        return _grouped_cache
     grouped: Dict[str, List[Dict[str, Any]]] = {}
     for entry in data:
+        if "_ts" not in entry:
+            try:
+                entry["_ts"] = datetime.datetime.fromisoformat(
+                    entry.get("timestamp", "")).timestamp()
+            except Exception:
+                continue
         device_name = entry.get("device_name", "Unknown")
         grouped.setdefault(device_name, []).append(entry)
+    for points in grouped.values():
+        points.sort(key=_ts_key)
+    _grouped_for, _grouped_cache = data, grouped
     return grouped
 
 
-def build_device_graph(device_name: str, data_points: List[Dict[str, Any]], config: DashboardConfig) -> Panel:
-    now = datetime.datetime.now()
+def point_value(value: Any) -> Optional[float]:
+    """
+    Возвращает значение точки графика как число: числа и числовые строки
+    преобразуются, пустые и нечисловые значения дают None (точка не рисуется).
+    """
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def build_axis_template(
+    drawing_width: int, plot_height: int, left_margin: int
+) -> Tuple[List[Tuple[str, str]], str, str, int, str]:
+    """
+    Возвращает неизменяемые части графика: подписи HR/SI для каждой строки,
+    линию оси X, строку отметок без текущего времени, позицию времени в ней
+    и подпись оси. Всё это зависит только от размеров, поэтому кэшируется.
+    """
+    key = (drawing_width, plot_height, left_margin)
+    template = _axis_cache.get(key)
+    if template is not None:
+        return template
+
+    # Выводим подписи только для каждой второй строки (для меньшей загруженности)
+    row_labels = []
+    for row in range(plot_height):
+        hr_label_val = 200 - ((200 - 55) / (plot_height - 1)) * row
+        si_label_val = 900 - ((900 - 50) / (plot_height - 1)) * row
+        if row % 2 == 0:
+            row_labels.append((f"{round(hr_label_val):>3}", f"{round(si_label_val):>3}"))
+        else:
+            row_labels.append(("   ", "   "))
+
+    # Ось X с горизонтальной линией и фиксированными метками; метка 0 —
+    # текущее время, оно подставляется в build_device_graph.
+    x_axis_line = " " * left_margin + "-" * drawing_width
+    tick_values = [80, 60, 40, 20]
+    tick_labels = ["-80", "-60", "-40", "-20"]
+    tick_line_list = [" " for _ in range(drawing_width)]
+    for tick, label in zip(tick_values, tick_labels):
+        pos = int((80 - tick) / 80 * (drawing_width - 1))
+        for i, ch in enumerate(label):
+            if pos + i < drawing_width:
+                tick_line_list[pos + i] = ch
+    clock_pos = drawing_width - 1
+    axis_label = "HR        Время: сек       SI"
+    offset = 0
+    # offset = left_margin + (drawing_width - len(axis_label)) // 2
+    x_axis_label_line = " " * offset + axis_label
+
+    template = (row_labels, x_axis_line, "".join(tick_line_list), clock_pos, x_axis_label_line)
+    _axis_cache[key] = template
+    return template
+
+
+def build_device_graph(
+    device_name: str,
+    data_points: List[Dict[str, Any]],
+    config: DashboardConfig,
+    now: datetime.datetime,
+    now_str: str,
+) -> Panel:
+    # now и now_str ("ЧЧ:ММ:СС") считаются один раз за тик в main для всех панелей
     # Отступы для подписей осей: слева — для HR, справа — для SI.
     left_margin = 6
     right_margin = 6
     drawing_width = config.panel_width - left_margin - right_margin
     plot_height = config.graph_height
 
-    # Создаем пустой "холст"
-    grid = [[" " for _ in range(drawing_width)] for _ in range(plot_height)]
+    # Создаем пустой "холст": по байту-коду на клетку, разметка собирается в конце
+    grid = [bytearray(drawing_width) for _ in range(plot_height)]
 
-    # Фильтруем данные за последние 80 секунд
-    valid_points = []
-    for point in data_points:
-        ts_str = point.get("timestamp", "")
-        try:
-            ts = datetime.datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            continue
-        diff = (now - ts).total_seconds()
-        if 0 <= diff <= 80:
-            valid_points.append((diff, point))
+    # Отбираем данные за последние 80 секунд: точки отсортированы по "_ts"
+    # (см. group_data_by_device), поэтому границы окна ищем бинарным поиском
+    now_ts = now.timestamp()
+    lo = bisect.bisect_left(data_points, now_ts - 80, key=_ts_key)
+    hi = bisect.bisect_right(data_points, now_ts, key=_ts_key)
+    valid_points = [(now_ts - point["_ts"], point) for point in data_points[lo:hi]]
 
     # Обрабатываем каждую точку
     for diff, point in valid_points:
@@ -99,94 +272,76 @@ def build_device_graph(device_name: str, data_points: List[Dict[str, Any]], conf
         y_hr = None
         y_si = None
 
-        # Вычисляем позицию для HR (диапазон 55–200 уд./мин)
-        hr_val = point.get("hr")
+        # Вычисляем позицию для HR (диапазон 55–200 уд./мин);
+        # пустые и нечисловые значения не рисуются
+        hr_val = point_value(point.get("hr"))
         if hr_val is not None:
-            try:
-                hr = float(hr_val)
-                norm_hr = (hr - 55) / (200 - 55)
-                norm_hr = max(0.0, min(1.0, norm_hr))
-                y_hr = plot_height - 1 - int(norm_hr * (plot_height - 1))
-            except Exception:
-                y_hr = None
+            norm_hr = (hr_val - 55) / (200 - 55)
+            norm_hr = max(0.0, min(1.0, norm_hr))
+            y_hr = plot_height - 1 - int(norm_hr * (plot_height - 1))
 
         # Вычисляем позицию для SI (диапазон 50–900 усл. ед.)
-        si_val = point.get("si")
+        si_val = point_value(point.get("si"))
         if si_val is not None:
-            try:
-                si = float(si_val)
-                norm_si = (si - 50) / (900 - 50)
-                norm_si = max(0.0, min(1.0, norm_si))
-                y_si = plot_height - 1 - int(norm_si * (plot_height - 1))
-            except Exception:
-                y_si = None
+            norm_si = (si_val - 50) / (900 - 50)
+            norm_si = max(0.0, min(1.0, norm_si))
+            y_si = plot_height - 1 - int(norm_si * (plot_height - 1))
 
         # Если оба параметра присутствуют, проверяем возможность конфликта
         if y_hr is not None and y_si is not None:
             if y_hr == y_si:
                 # В ячейке с конфликтом приоритет за SI:
-                grid[y_si][x] = "[cyan]o[/cyan]"
+                grid[y_si][x] = CELL_SI
                 # Пытаемся разместить HR ниже на одну клетку, если она свободна
                 new_y_hr = y_hr + \
                     1 if (y_hr < plot_height -
-                          1 and grid[y_hr+1][x].strip() == "") else y_hr
-                if grid[new_y_hr][x].strip() == "":
-                    grid[new_y_hr][x] = "[red]*[/red]"
-                else:
-                    grid[new_y_hr][x] = "[bold magenta]X[/bold magenta]"
+                          1 and grid[y_hr+1][x] == CELL_EMPTY) else y_hr
+                grid[new_y_hr][x] = CELL_HR if grid[new_y_hr][x] == CELL_EMPTY else CELL_X
             else:
                 # Если ячейки не пересекаются – размещаем каждое значение в своей клетке.
-                if grid[y_hr][x].strip() == "":
-                    grid[y_hr][x] = "[red]*[/red]"
-                else:
-                    grid[y_hr][x] = "[bold magenta]X[/bold magenta]"
-                grid[y_si][x] = "[cyan]o[/cyan]"
+                grid[y_hr][x] = CELL_HR if grid[y_hr][x] == CELL_EMPTY else CELL_X
+                grid[y_si][x] = CELL_SI
         elif y_hr is not None:
-            if grid[y_hr][x].strip() == "":
-                grid[y_hr][x] = "[red]*[/red]"
-            else:
-                grid[y_hr][x] = "[bold magenta]X[/bold magenta]"
+            grid[y_hr][x] = CELL_HR if grid[y_hr][x] == CELL_EMPTY else CELL_X
         elif y_si is not None:
-            grid[y_si][x] = "[cyan]o[/cyan]"
+            grid[y_si][x] = CELL_SI
+
+    row_labels, x_axis_line, tick_template, clock_pos, x_axis_label_line = \
+        build_axis_template(drawing_width, plot_height, left_margin)
 
     # Формируем строки для графика, добавляя подписи по оси Y.
-    # Выводим подписи только для каждой второй строки (для меньшей загруженности)
     # Левые подписи (HR) окрашены в красный, правые (SI) – в голубой.
-    lines = []
-    for row in range(plot_height):
-        hr_label_val = 200 - ((200 - 55) / (plot_height - 1)) * row
-        si_label_val = 900 - ((900 - 50) / (plot_height - 1)) * row
+    # Весь график собирается в один Text: простой текст плюс диапазоны стилей.
+    graph_text = Text()
+    for row, (left_label, right_label) in enumerate(row_labels):
+        row_start = len(graph_text)
+        content_line = "".join(CELL_CHARS[code] for code in grid[row])
+        graph_text.append(f"{left_label} {content_line} {right_label}\n")
         if row % 2 == 0:
-            left_label = f"[red]{round(hr_label_val):>3}[/red]"
-            right_label = f"[cyan]{round(si_label_val):>3}[/cyan]"
-        else:
-            left_label = "   "
-            right_label = "   "
-        content_line = "".join(grid[row])
-        lines.append(f"{left_label} {content_line} {right_label}")
-
-    # Рисуем ось X с горизонтальной линией и фиксированными метками.
-    x_axis_line = " " * left_margin + "-" * drawing_width
-    tick_values = [80, 60, 40, 20, 0]
-    tick_labels = ["-80", "-60", "-40", "-20",
-                   datetime.datetime.now().strftime("%H:%M:%S")]
-    tick_line_list = [" " for _ in range(drawing_width)]
-    for tick, label in zip(tick_values, tick_labels):
-        pos = int((80 - tick) / 80 * (drawing_width - 1))
-        for i, ch in enumerate(label):
-            if pos + i < drawing_width:
-                tick_line_list[pos + i] = ch
-    tick_line = " " * left_margin + "".join(tick_line_list)
-    axis_label = "HR        Время: сек       SI"
-    offset = 0
-    # offset = left_margin + (drawing_width - len(axis_label)) // 2
-    x_axis_label_line = " " * offset + axis_label
-
-    graph_text = "\n".join(lines + [x_axis_line, tick_line, x_axis_label_line])
+            graph_text.stylize(STYLE_HR, row_start, row_start + 3)
+            right_start = row_start + 3 + 1 + drawing_width + 1
+            graph_text.stylize(STYLE_SI, right_start, right_start + 3)
+        # Одинаковые соседние клетки получают один общий диапазон стиля
+        pos = row_start + 3 + 1
+        for code, run in groupby(grid[row]):
+            count = sum(1 for _ in run)
+            if code != CELL_EMPTY:
+                graph_text.stylize(CELL_STYLES[code], pos, pos + count)
+            pos += count
+
+    # В строку отметок подставляется только текущее время (обрезанное по ширине)
+    clock = now_str[:drawing_width - clock_pos]
+    tick_line = (" " * left_margin + tick_template[:clock_pos] + clock
+                 + tick_template[clock_pos + len(clock):])
+
+    graph_text.append("\n".join([x_axis_line, tick_line, x_axis_label_line]))
     return Panel(graph_text, title=device_name, width=config.panel_width, expand=False)
 
 
 def build_reference_panel(config: DashboardConfig) -> Panel:
+    panel = _reference_panel_cache.get(config.panel_width)
+    if panel is not None:
+        return panel
     reference_text = (
         "[bold underline]Справка по графику:[/bold underline]\n"
         "Ось X: последние 80 секунд. Отметки: -80, -60, -40, -20, Now (текущее время)\n"
@@ -194,11 +349,17 @@ def build_reference_panel(config: DashboardConfig) -> Panel:
         "Правая ось Y (SI): 50–900 усл. ед., отображается [cyan]o[/cyan]\n"
         "При пересечении SI имеет приоритет, а HR сдвигается вниз."
     )
-    return Panel(Text.from_markup(reference_text), title="Справка", width=config.panel_width, expand=False)
+    panel = Panel(Text.from_markup(reference_text), title="Справка", width=config.panel_width, expand=False)
+    _reference_panel_cache[config.panel_width] = panel
+    return panel
 
 
 def build_empty_panel(config: DashboardConfig) -> Panel:
-    return Panel("", width=config.panel_width, expand=False, box=box.SIMPLE)
+    panel = _empty_panel_cache.get(config.panel_width)
+    if panel is None:
+        panel = Panel("", width=config.panel_width, expand=False, box=box.SIMPLE)
+        _empty_panel_cache[config.panel_width] = panel
+    return panel
 
 
 def build_generic_layout(
@@ -208,11 +369,29 @@ def build_generic_layout(
     current_time: str,
     countdown: int,
 ) -> Table:
+    global _layout_cache
     grid_rows, grid_cols = config.grid_layout
-    grid = Table.grid(padding=(0, 1))
     total_cells = grid_rows * grid_cols
     panels_extended = panels + \
         [build_empty_panel(config) for _ in range(total_cells - len(panels))]
+    header_cells = (
+        f"Session: {session}",
+        f"Time: {current_time}",
+        f"Next update in: {countdown} s",
+    )
+
+    # Если сетка не менялась, подменяем содержимое ячеек в уже построенных
+    # таблицах вместо того, чтобы собирать их заново на каждом тике.
+    if _layout_cache is not None and _layout_cache[0] == config.grid_layout:
+        _, layout, header, grid = _layout_cache
+        for column, cell in zip(header.columns, header_cells):
+            column._cells[0] = cell
+        for row in range(grid_rows):
+            for col in range(grid_cols):
+                grid.columns[col]._cells[row] = panels_extended[row * grid_cols + col]
+        return layout
+
+    grid = Table.grid(padding=(0, 1))
     for row in range(grid_rows):
         row_items = panels_extended[row * grid_cols: (row + 1) * grid_cols]
         grid.add_row(*row_items)
@@ -220,31 +399,37 @@ def build_generic_layout(
     header.add_column(justify="left")
     header.add_column(justify="center")
     header.add_column(justify="right")
-    header.add_row(
-        f"Session: {session}",
-        f"Time: {current_time}",
-        f"Next update in: {countdown} s",
-    )
+    header.add_row(*header_cells)
     layout = Table.grid(expand=True)
     layout.add_row(header)
     layout.add_row(grid)
+    _layout_cache = (config.grid_layout, layout, header, grid)
     return layout
 
 
 def main() -> None:
     update_interval: int = 3  # интервал обновления данных в секундах
-    last_update: float = time.time() - update_interval
+    tick_interval: float = 1.0  # интервал перерисовки экрана в секундах
+    # Интервалы отсчитываются по time.monotonic(): перевод системных часов
+    # не сбивает обратный отсчёт
+    last_update: float = time.monotonic() - update_interval
+    next_tick: float = time.monotonic()
     config = DashboardConfig()
     data: List[Dict[str, Any]] = load_data()
     session: str = data[0].get("session", "N/A") if data else "N/A"
+    # Изменение файла данных будит цикл сразу, не дожидаясь конца секунды
+    data_changed = threading.Event()
+    observer = start_data_watcher(DATA_FILE, data_changed)
 
-    with Live(console=console, refresh_per_second=4, screen=True) as live:
+    # Экран перерисовывается только по тикам цикла, без фонового автообновления
+    with Live(console=console, auto_refresh=False, screen=True) as live:
         try:
             while True:
-                now = time.time()
+                now = time.monotonic()
                 countdown: int = max(0, update_interval -
                                      int(now - last_update))
-                if countdown <= 0:
+                if countdown <= 0 or data_changed.is_set():
+                    data_changed.clear()
                     data = load_data()
                     session = data[0].get("session", "N/A") if data else "N/A"
                     last_update = now
@@ -255,21 +440,33 @@ def main() -> None:
                 adjusted_panel_width = max(30, (term_width // grid_cols) - 2)
                 config.panel_width = adjusted_panel_width
 
-                current_time_str = datetime.datetime.now().strftime("%H:%M:%S")
+                current_time = datetime.datetime.now()
+                current_time_str = current_time.strftime("%H:%M:%S")
                 grouped_data = group_data_by_device(data)
                 device_panels = [
                     build_device_graph(
-                        device, grouped_data.get(device, []), config)
+                        device, grouped_data.get(device, []), config,
+                        current_time, current_time_str)
                     for device in config.devices_to_display
                 ]
                 if config.include_reference_panel:
                     device_panels.append(build_reference_panel(config))
                 layout = build_generic_layout(
                     device_panels, config, session, current_time_str, countdown)
-                live.update(layout)
-                time.sleep(1)
+                live.update(layout, refresh=True)
+
+                # Дедлайн следующего тика сдвигается от предыдущего дедлайна, а не от
+                # конца отрисовки, поэтому тики не «уплывают»; пропущенные не догоняем
+                now = time.monotonic()
+                if next_tick <= now:
+                    next_tick += tick_interval * (int((now - next_tick) / tick_interval) + 1)
+                data_changed.wait(next_tick - now)
         except KeyboardInterrupt:
             console.print("[bold red]Exiting...[/bold red]")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
 
 
 if __name__ == "__main__":
@@ -9,48 +9,88 @@ TUI Dashboard для отображения данных устройств с 
 """
 
 import json
+import mmap
+import os
 import time
 import datetime
+import heapq
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from rich import box
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    # Без orjson разбираем stdlib json (он не принимает memoryview)
+    def json_loads(buf: Any) -> Any:
+        return json.loads(bytes(buf))
+
+MMAP_THRESHOLD = 1024 * 1024  # Файлы от 1 МБ читаются через mmap без копии
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+TS_CACHE_SIZE = 4096  # Таблицы каждую секунду показывают одни и те же метки
+CELL_CACHE_SIZE = 8192  # Отформатированные ячейки (параметр, значение)
+# Открывающий и закрывающий теги разметки для цветов get_color_for_param
+COLOR_TAGS = {
+    color: (f"[{color}]", f"[/{color}]") for color in ("blue", "green", "yellow", "red")
+}
+
+# Сопоставление столбцов с ключами данных
+COLUMN_KEY_MAP = {
+    "Time": "timestamp",
+    "HR": "hr",
+    "LF/HF": "lf_hf_ratio",
+    "RMSSD": "rmssd",
+    "SDRR": "sdrr",
+    "SI": "si",
+}
+
 console = Console()
 
+# Ключ (путь, mtime_ns, размер) последней загрузки и её результат
+_data_cache_key: Optional[Tuple[str, int, int]] = None
+_data_cache: List[Dict[str, Any]] = []
+# Данные и число строк, для которых отобраны последние записи, и результат
+_newest_for: Optional[List[Dict[str, Any]]] = None
+_newest_count: int = 0
+_newest_cache: Dict[str, List[Dict[str, Any]]] = {}
+# Неизменяемые панели, закэшированные по ширине (panel_width -> Panel)
+_empty_panel_cache: Dict[int, Panel] = {}
+_reference_panel_cache: Dict[int, Panel] = {}
+
 
-@dataclass
+# Конфигурация не меняется во время работы: неизменяемый экземпляр со слотами
+@dataclass(frozen=True, slots=True)
 class DashboardConfig:
     data_row_count: int = 7
     panel_width: int = 60
-    columns_order: List[str] = field(
-        # default_factory=lambda: ["Time", "HR", "LF/HF", "RMSSD", "SDRR", "SI"]
-        default_factory=lambda: ["Time", "HR", "SI"]
-    )
-    columns_width: Dict[str, int] = field(
-        default_factory=lambda: {
+    # columns_order: Tuple[str, ...] = ("Time", "HR", "LF/HF", "RMSSD", "SDRR", "SI")
+    columns_order: Tuple[str, ...] = ("Time", "HR", "SI")
+    columns_width: Mapping[str, int] = field(
+        default_factory=lambda: MappingProxyType({
             "Time": 15,
             "HR": 8,
             "LF/HF": 7,
             "RMSSD": 8,
             "SDRR": 7,
             "SI": 8,
-        }
+        })
     )
-    devices_to_display: List[str] = field(
-        default_factory=lambda: [
-            # "swaid 1319",
-            "swaid 1341",
-            "swaid 1330",
-            "swaid 1327",
-            # "swaid 1329",
-            "swaid 1336",
-        ]
+    devices_to_display: Tuple[str, ...] = (
+        # "swaid 1319",
+        "swaid 1341",
+        "swaid 1330",
+        "swaid 1327",
+        # "swaid 1329",
+        "swaid 1336",
     )
     grid_layout: Tuple[int, int] = (2, 6)  # (rows, columns)
     include_reference_panel: bool = False
@@ -119,18 +159,43 @@ def formatted_cell(param: str, value: Any) -> str:
         return ""
     color = get_color_for_param(param, value)
     if color:
-        return f"[{color}]{value}[/{color}]"
+        open_tag, close_tag = COLOR_TAGS[color]
+        return open_tag + str(value) + close_tag
     return str(value)
 
 
+@lru_cache(maxsize=CELL_CACHE_SIZE, typed=True)
+def formatted_cell_cached(param: str, value: Any) -> str:
+    """
+    formatted_cell с кэшем: после перезагрузки данных большая часть строк
+    таблиц остаётся прежней. typed=True, чтобы 70 и 70.0 не делили одну
+    запись — выводятся они по-разному.
+    """
+    return formatted_cell(param, value)
+
+
 def load_data(file_path: str = "td_data.json") -> List[Dict[str, Any]]:
     """
     Загружает данные из JSON-файла.
+    Если файл не менялся с прошлой загрузки (mtime и размер те же),
+    возвращает ранее разобранные данные без чтения файла.
     При возникновении ошибки загрузки выводит сообщение и возвращает пустой список.
     """
+    global _data_cache_key, _data_cache
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            return json.load(file)
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+        if key == _data_cache_key:
+            return _data_cache
+        with open(file_path, "rb") as file:
+            if stat.st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf, \
+                        memoryview(buf) as view:
+                    data = json_loads(view)
+            else:
+                data = json_loads(file.read())
+        _data_cache_key, _data_cache = key, data
+        return data
     except Exception as error:
         console.print(f"[red]Ошибка загрузки данных:[/red] {error}")
         return []
@@ -148,11 +213,100 @@ def group_data_by_device(data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str,
     return grouped
 
 
+def select_newest_rows(
+    data_points: List[Dict[str, Any]], row_count: int
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает последние row_count записей в порядке возрастания времени.
+    """
+    # Нужны только последние row_count записей: выбираем их через
+    # heapq.nlargest вместо сортировки всей истории. Метки фиксированной
+    # ширины "ГГГГ-ММ-ДД ЧЧ:ММ:СС" сравниваются как строки; индекс в ключе
+    # сохраняет исходный порядок записей с одинаковой меткой.
+    try:
+        newest = heapq.nlargest(
+            row_count,
+            enumerate(data_points),
+            key=lambda item: (item[1].get("timestamp", ""), item[0]),
+        )
+        return [point for _, point in reversed(newest)]
+    except Exception as error:
+        console.print(f"[red]Ошибка сортировки данных:[/red] {error}")
+        return data_points[-row_count:]
+
+
+def newest_rows_by_device(
+    data: List[Dict[str, Any]], row_count: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Группирует записи по устройствам и отбирает для каждого последние
+    row_count записей. Данные перезагружаются реже, чем перерисовывается
+    экран, поэтому пока load_data возвращает тот же список, повторно
+    используется прежний результат.
+    """
+    global _newest_for, _newest_count, _newest_cache
+    if data is _newest_for and row_count == _newest_count:
+        return _newest_cache
+
+    # Один проход с ограниченной кучей (метка, индекс, запись) на устройство:
+    # в памяти держится не больше row_count записей каждого устройства.
+    # Индекс, как и в select_newest_rows, упорядочивает записи с одинаковой
+    # меткой и не даёт сравнивать сами словари.
+    heaps: Dict[str, List[Tuple[str, int, Dict[str, Any]]]] = {}
+    try:
+        for index, entry in enumerate(data):
+            heap = heaps.setdefault(entry.get("device_name", "Unknown"), [])
+            item = (entry.get("timestamp", ""), index, entry)
+            if len(heap) < row_count:
+                heapq.heappush(heap, item)
+            elif heap and item > heap[0]:
+                heapq.heapreplace(heap, item)
+        newest = {
+            device: [entry for _, _, entry in sorted(heap)]
+            for device, heap in heaps.items()
+        }
+    except TypeError:
+        # Несравнимые метки (например, null): поустройственный путь с его
+        # сообщением об ошибке и запасным порядком
+        newest = {
+            device: select_newest_rows(points, row_count)
+            for device, points in group_data_by_device(data).items()
+        }
+    _newest_cache = newest
+    _newest_for, _newest_count = data, row_count
+    return _newest_cache
+
+
+@lru_cache(maxsize=None)
+def column_schema(columns_order: Tuple[str, ...]) -> Tuple[Tuple[str, str, bool], ...]:
+    """
+    Возвращает схему столбцов: (столбец, ключ данных, это ли столбец времени).
+    columns_order — кортеж из неизменяемой конфигурации, поэтому схема
+    вычисляется один раз.
+    """
+    return tuple(
+        (col, COLUMN_KEY_MAP.get(col, col), col == "Time") for col in columns_order
+    )
+
+
+@lru_cache(maxsize=TS_CACHE_SIZE)
+def parse_ts(timestamp: str) -> datetime.datetime:
+    """Разбирает метку времени "ГГГГ-ММ-ДД ЧЧ:ММ:СС" (результат кэшируется)."""
+    return datetime.datetime.strptime(timestamp, TS_FORMAT)
+
+
+@lru_cache(maxsize=TS_CACHE_SIZE)
+def format_hms(timestamp: str) -> str:
+    """Возвращает время метки в виде "ЧЧ:ММ:СС" (результат кэшируется)."""
+    return parse_ts(timestamp).strftime("%H:%M:%S")
+
+
 def build_device_table(
-    data_points: List[Dict[str, Any]], config: DashboardConfig
+    rows_to_display: List[Dict[str, Any]], config: DashboardConfig
 ) -> Table:
     """
     Создаёт таблицу для отображения данных устройства.
+    rows_to_display — уже отобранные последние записи (см. select_newest_rows).
     Таблица выводит ровно config.data_row_count рядов данных,
     заполняя недостающие строки пустыми значениями.
     Столбцы и их порядок определяются конфигурацией.
@@ -166,45 +320,29 @@ def build_device_table(
         width = config.columns_width.get(col)
         table.add_column(col, justify="center", no_wrap=True, width=width)
 
-    sorted_points: List[Dict[str, Any]] = []
-    try:
-        if data_points:
-            sorted_points = sorted(
-                data_points,
-                key=lambda x: datetime.datetime.strptime(
-                    x.get("timestamp", ""), "%Y-%m-%d %H:%M:%S"
-                ),
-            )
-    except Exception as error:
-        console.print(f"[red]Ошибка сортировки данных:[/red] {error}")
-        sorted_points = data_points or []
-
-    rows_to_display = sorted_points[-config.data_row_count:] if sorted_points else []
-
-    # Сопоставление столбцов с ключами данных
-    column_key_map = {
-        "Time": "timestamp",
-        "HR": "hr",
-        "LF/HF": "lf_hf_ratio",
-        "RMSSD": "rmssd",
-        "SDRR": "sdrr",
-        "SI": "si",
-    }
+    # Схема столбцов определяется один раз, а не в каждой ячейке
+    schema = column_schema(config.columns_order)
 
     for point in rows_to_display:
+        get = point.get
         row_values = []
-        for col in config.columns_order:
-            key = column_key_map.get(col, col)
-            value = point.get(key, "")
-            if col == "Time" and value:
-                try:
-                    formatted_time = datetime.datetime.strptime(
-                        value, "%Y-%m-%d %H:%M:%S"
-                    ).strftime("%H:%M:%S")
-                    value = formatted_time
-                except Exception:
-                    pass
-            row_values.append(formatted_cell(col, value))
+        for col, key, is_time in schema:
+            value = get(key, "")
+            if is_time and value:
+                # "ГГГГ-ММ-ДД ЧЧ:ММ:СС": время берём срезом, разбор — только
+                # для меток в другом формате
+                if isinstance(value, str) and len(value) == 19 and value[10] == " ":
+                    value = value[11:19]
+                else:
+                    try:
+                        value = format_hms(value)
+                    except Exception:
+                        pass
+            # Списки и словари не хешируются и в кэш не попадают
+            if isinstance(value, (list, dict)):
+                row_values.append(formatted_cell(col, value))
+            else:
+                row_values.append(formatted_cell_cached(col, value))
         table.add_row(*row_values)
 
     # Если записей меньше требуемого числа, дополняем пустыми строками
@@ -215,20 +353,24 @@ def build_device_table(
 
 
 def build_device_panel(
-    device_name: str, data_points: List[Dict[str, Any]], config: DashboardConfig
+    device_name: str, rows_to_display: List[Dict[str, Any]], config: DashboardConfig
 ) -> Panel:
     """
     Оборачивает таблицу устройства в панель с фиксированной шириной.
     Высота панели автоматически определяется содержимым.
     """
-    content = build_device_table(data_points, config)
+    content = build_device_table(rows_to_display, config)
     return Panel(content, title=device_name, width=config.panel_width, expand=False)
 
 
 def build_reference_panel(config: DashboardConfig) -> Panel:
     """
     Создаёт панель со справочной информацией по параметрам и их цветовой разметке.
+    Панель зависит только от ширины, поэтому кэшируется.
     """
+    panel = _reference_panel_cache.get(config.panel_width)
+    if panel is not None:
+        return panel
     reference_text = (
         "[bold underline]Справочная информация:[/bold underline]\n"
         "[bold]HR:[/bold] 60–100 [green]зеленый[/green], <60 [blue]синий[/blue], >100 [red]красный[/red]\n"
@@ -237,31 +379,31 @@ def build_reference_panel(config: DashboardConfig) -> Panel:
         "[bold]SDRR:[/bold] <50 [red]красный[/red], 50–100 [yellow]желтый[/yellow], ≥100 [green]зеленый[/green]\n"
         "[bold]SI:[/bold] <50 [green]зеленый[/green], 50–100 [yellow]желтый[/yellow], ≥100 [red]красный[/red]"
     )
-    return Panel(
+    panel = Panel(
         Text.from_markup(reference_text),
         title="Справка",
         width=config.panel_width,
         expand=False,
     )
+    _reference_panel_cache[config.panel_width] = panel
+    return panel
 
 
 def build_empty_panel(config: DashboardConfig) -> Panel:
     """
     Возвращает пустую панель с фиксированной шириной для заполнения пустых ячеек.
+    Панель одна на каждую ширину и переиспользуется во всех пустых ячейках.
     """
-    return Panel("", width=config.panel_width, expand=False, box=box.SIMPLE)
+    panel = _empty_panel_cache.get(config.panel_width)
+    if panel is None:
+        panel = Panel("", width=config.panel_width, expand=False, box=box.SIMPLE)
+        _empty_panel_cache[config.panel_width] = panel
+    return panel
 
 
-def build_generic_layout(
-    panels: List[Panel],
-    config: DashboardConfig,
-    session: str,
-    current_time: str,
-    countdown: int,
-) -> Table:
+def build_panel_grid(panels: List[Panel], config: DashboardConfig) -> Table:
     """
-    Формирует общий макет с заголовком и сеткой, определяемой конфигурацией.
-    Заголовок содержит информацию о сессии, времени и обратном отсчёте.
+    Формирует сетку панелей, определяемую конфигурацией.
     Если переданное число панелей меньше требуемых ячеек сетки,
     оставшиеся заполняются пустыми панелями.
     """
@@ -275,7 +417,20 @@ def build_generic_layout(
     for row in range(grid_rows):
         row_items = panels_extended[row * grid_cols:(row + 1) * grid_cols]
         grid.add_row(*row_items)
+    return grid
+
 
+def build_generic_layout(
+    grid: Table,
+    session: str,
+    current_time: str,
+    countdown: int,
+) -> Group:
+    """
+    Формирует общий макет из заголовка и готовой сетки панелей.
+    Заголовок содержит информацию о сессии, времени и обратном отсчёте.
+    Каждый тик строится только заголовок; сетка ставится под ним как есть.
+    """
     header = Table.grid(expand=True)
     header.add_column(justify="left")
     header.add_column(justify="center")
@@ -286,10 +441,7 @@ def build_generic_layout(
         f"Next update in: {countdown} s",
     )
 
-    layout = Table.grid(expand=True)
-    layout.add_row(header)
-    layout.add_row(grid)
-    return layout
+    return Group(header, grid)
 
 
 def main() -> None:
@@ -297,15 +449,24 @@ def main() -> None:
     Запускает цикл обновления TUI с периодической перезагрузкой данных.
     """
     update_interval: int = 3  # Интервал обновления данных в секундах
-    last_update: float = time.time() - update_interval
+    tick_interval: float = 1.0  # интервал перерисовки экрана в секундах
+    # Интервалы отсчитываются по time.monotonic(): перевод системных часов
+    # не сбивает обратный отсчёт
+    last_update: float = time.monotonic() - update_interval
+    next_tick: float = time.monotonic()
     config = DashboardConfig()  # Здесь можно изменить значения для кастомизации
     data: List[Dict[str, Any]] = load_data()
     session: str = data[0].get("session", "N/A") if data else "N/A"
+    # Таблицы зависят только от данных: сетка панелей пересобирается, лишь
+    # когда newest_rows_by_device вернул новый результат
+    panel_grid: Optional[Table] = None
+    grid_rows_source: Optional[Dict[str, List[Dict[str, Any]]]] = None
 
-    with Live(console=console, refresh_per_second=4, screen=True) as live:
+    # Экран перерисовывается только по тикам цикла, без фонового автообновления
+    with Live(console=console, auto_refresh=False, screen=True) as live:
         try:
             while True:
-                now: float = time.time()
+                now: float = time.monotonic()
                 countdown: int = max(0, update_interval -
                                      int(now - last_update))
                 if countdown <= 0:
@@ -314,20 +475,29 @@ def main() -> None:
                     last_update = now
 
                 current_time: str = datetime.datetime.now().strftime("%H:%M:%S")
-                grouped_data = group_data_by_device(data)
-                device_panels = [
-                    build_device_panel(
-                        device, grouped_data.get(device, []), config)
-                    for device in config.devices_to_display
-                ]
-                if config.include_reference_panel:
-                    device_panels.append(build_reference_panel(config))
+                newest_rows = newest_rows_by_device(data, config.data_row_count)
+                if panel_grid is None or newest_rows is not grid_rows_source:
+                    device_panels = [
+                        build_device_panel(
+                            device, newest_rows.get(device, []), config)
+                        for device in config.devices_to_display
+                    ]
+                    if config.include_reference_panel:
+                        device_panels.append(build_reference_panel(config))
+                    panel_grid = build_panel_grid(device_panels, config)
+                    grid_rows_source = newest_rows
 
                 layout = build_generic_layout(
-                    device_panels, config, session, current_time, countdown
+                    panel_grid, session, current_time, countdown
                 )
-                live.update(layout)
-                time.sleep(1)
+                live.update(layout, refresh=True)
+
+                # Дедлайн следующего тика сдвигается от предыдущего дедлайна, а не от
+                # конца отрисовки, поэтому тики не «уплывают»; пропущенные не догоняем
+                now = time.monotonic()
+                if next_tick <= now:
+                    next_tick += tick_interval * (int((now - next_tick) / tick_interval) + 1)
+                time.sleep(next_tick - now)
         except KeyboardInterrupt:
             console.print("[bold red]Exiting...[/bold red]")
 